@@ -8,54 +8,255 @@ Uso:
     for linea in asa.preorder_lines():
         print(linea)
 """
+import gc
+import hashlib
+import os
+import pickle
+import sys
+from functools import lru_cache, partial
 from typing import List, Optional
 from explorador import AnalizadorLexico, TokenLexico, TipoToken
 from nodo import asaNode
 
+# Máximo de errores sintácticos que se acumulan por archivo
+_MAX_ERRORES = 200
+
+# Versión del formato de la caché en disco. La llave ya incluye un hash del código
+# del explorador, el parser y nodo.py, así que cualquier cambio en ellos invalida
+# las entradas viejas solo; esta versión queda para cambios en cómo se guarda
+_VERSION_CACHE = "2"
+
+# Tipos de token usados por el parser, enlazados una sola vez a nivel de módulo
+_TT_COMENT = TipoToken.COMENTARIO
+_TT_DECL = TipoToken.DECLARACION_ENTIDAD
+_TT_CTRL = TipoToken.ESTRUCTURA_CONTROL_FLUJO
+_TT_INVOC = TipoToken.INVOCACION_FUNCION
+_TT_IDENT = TipoToken.NOMBRE_IDENTIFICADOR
+_TT_SYM = TipoToken.SIMBOLO_PUNTUACION
+_TT_NUM = TipoToken.NUMERO_ENTERO
+_TT_COMP = TipoToken.OPERADOR_COMPARACION
+_TT_ARIT = TipoToken.OPERADOR_ARITMETICO
+_TT_ESPECIAL = TipoToken.OPERADOR_ESPECIAL
+_TT_CLAVE = TipoToken.PALABRA_CLAVE
+_TT_DOMINIO = TipoToken.TIPO_DATO_DOMINIO
+_TT_RESULTADO = TipoToken.RESULTADO_ADICIONAL
+_TT_EMPATE = TipoToken.CONDICION_EMPATE
+
+# Textos (en minúsculas) que cierran el cuerpo de cada bloque de control
+_FIN_CONDICIONAL = frozenset(("}", "sino", "endif"))
+_FIN_SINO = frozenset(("}", "endif"))
+_FIN_REPETIR = frozenset(("finrep", "]"))
+_FIN_REPETIR_HASTA = frozenset(("finrephast", "]"))
+# Bloques Repetir: palabra -> (terminadores del cuerpo, palabra de cierre, mensaje si falta el cierre)
+_BLOQUES_REPETIR = {
+    "Repetir": (_FIN_REPETIR, "FinRep", "Falta 'FinRep' después del bloque Repetir"),
+    "RepetirHasta": (_FIN_REPETIR_HASTA, "FinRepHast", "Falta 'FinRepHast' en RepetirHasta"),
+}
+# Terminadores de una acción genérica (AccionStub)
+_FIN_ACCION = frozenset(("finact", "fincarr", "finruti", "finprep"))
+# Anclas de synchronize: tipos de token y símbolos de cierre de bloque
+_TIPOS_ANCLA = frozenset((_TT_DECL, _TT_CTRL, _TT_CLAVE))
+_SIMBOLOS_CIERRE = frozenset(("}", "]", ")"))
+# Textos que sirven de punto de sincronización cuando cambian de línea
+_TOKENS_SINCRONIZACION = frozenset(("deportista", "lista", "si", "repetir", "repetirhasta", "finrep", "finrephast",
+                                    "endif", "sino", "narrar", "input", "finact", "fincarr", "finruti"))
+# Competencias con inicio y cierre propios: nombre -> (palabra de inicio, palabra de cierre)
+_COMPETENCIAS = {
+    "Carrera": ("InicioCarrera", "finCarr"),
+    "Rutina": ("InicioRutina", "finRuti"),
+    "Combate": ("InicioCombate", "finComb"),
+}
+# Tokens que pueden seguir al Resultado de un Partido
+_TRAS_RESULTADO_PARTIDO = frozenset(("listares", "empate"))
+# Tokens que una acción genérica deja para la competencia que la contiene
+_FIN_ACCION_EXTERNO = frozenset(("resultado", "listares", "empate"))
+
+# Comandos de un solo token: (tipo de token, texto en minúsculas) -> tipo de nodo
+_NODOS_SIMPLES = {
+    (_TT_CTRL, "finrep"): "Cierre",
+    (_TT_CTRL, "finrephast"): "Cierre",
+    (_TT_CTRL, "endif"): "Cierre",
+    (_TT_CLAVE, "finact"): "FinAct",
+    (_TT_CLAVE, "fincarr"): "FinCarr",
+    (_TT_CLAVE, "finruti"): "FinRuti",
+    (_TT_CLAVE, "fincomb"): "FinComb",
+    (_TT_CLAVE, "preparacion"): "Clave",
+    (_TT_CLAVE, "ejecutar"): "Clave",
+    (_TT_CLAVE, "correr"): "Clave",
+    (_TT_CLAVE, "finprep"): "Clave",
+}
+
+# Primarios de un solo token en expresiones: tipo de token -> tipo de nodo
+_NODOS_PRIMARIOS = {
+    _TT_NUM: "Numero",
+    _TT_IDENT: "Nombre",
+}
+
+# Precedencia de operadores binarios: (tipo de token, operador) -> nivel
+_PRECEDENCIA = {
+    (_TT_COMP, "=="): 1,
+    (_TT_COMP, "!="): 1,
+    (_TT_COMP, "<"): 1,
+    (_TT_COMP, ">"): 1,
+    (_TT_COMP, "<="): 1,
+    (_TT_COMP, ">="): 1,
+    (_TT_ARIT, "+"): 2,
+    (_TT_ARIT, "-"): 2,
+    (_TT_ARIT, "*"): 3,
+    (_TT_ARIT, "/"): 3,
+    (_TT_ARIT, "%"): 3,
+}
+
 
 class ParserError(Exception):
     pass
 
 
 class Parser:
+    __slots__ = ("tokens", "_ntok", "_tipos", "_textos", "_originales", "_lineas", "pos", "errors",
+                 "_sync_tokens", "_es_sync", "_rol_arg", "_error_keys", "_despacho", "_despacho_bloques", "_despacho_tipo")
+
     def __init__(self, tokens: List[TokenLexico]):
         self.tokens = tokens
+        self._ntok = len(tokens)
+        # Columnas paralelas a tokens (tipo, texto en minúsculas, texto original y
+        # línea) para leer cada token por índice sin pasar por sus atributos
+        self._tipos = [t.tipo_token for t in tokens]
+        self._textos = [t.texto_lower for t in tokens]
+        self._originales = [t.texto_original for t in tokens]
+        self._lineas = [t.numero_linea for t in tokens]
         self.pos = 0
         self.errors: List[dict] = []  # acumulación de errores sintácticos
-        self.sync_tokens = {"deportista","lista","si","repetir","repetirhasta","finrep","finrephast","endif","sino","narrar","input","finact","fincarr","finruti"}
+        # Marca por token de si su texto está en sync_tokens; se arma en el primer error
+        # y se descarta cada vez que se asigna sync_tokens
+        self._es_sync = None
+        self.sync_tokens = _TOKENS_SINCRONIZACION
+        # Rol de cada token dentro de una lista de argumentos (0 normal, 1 coma, 2 ')');
+        # se arma en la primera invocación
+        self._rol_arg = None
         # Conjunto para deduplicar errores (mensaje, linea, columna)
         self._error_keys = set()
+        # Despacho de Comando por (tipo de token, texto en minúsculas)
+        self._despacho = {
+            (_TT_DECL, "deportista"): self.parse_deportista,
+            (_TT_DECL, "lista"): self.parse_lista_o_carga,
+            (_TT_CTRL, "si"): self.parse_condicional,
+            (_TT_CTRL, "repetir"): self.parse_repetir,
+            (_TT_CTRL, "repetirhasta"): self.parse_repetir_hasta,
+            (_TT_INVOC, "narrar("): self.parse_narrar,
+            (_TT_INVOC, "input("): self.parse_dirigir,
+            (_TT_CLAVE, "iniciocarrera"): self.parse_carrera,
+            (_TT_CLAVE, "iniciorutina"): self.parse_rutina,
+            (_TT_CLAVE, "iniciocombate"): self.parse_combate,
+            # Resultado ::= "Resultado" Numero "-" Numero
+            (_TT_DOMINIO, "resultado"): self.parse_resultado,
+        }
+        # Bloques con cuerpo de comandos: se recorren con _trampolin en lugar de recursión
+        self._despacho_bloques = {
+            (_TT_CTRL, "si"): self._gen_condicional,
+            (_TT_CTRL, "repetir"): partial(self._gen_repetir, "Repetir"),
+            (_TT_CTRL, "repetirhasta"): partial(self._gen_repetir, "RepetirHasta"),
+            (_TT_CLAVE, "iniciocarrera"): partial(self._gen_competencia, "Carrera"),
+            (_TT_CLAVE, "iniciorutina"): partial(self._gen_competencia, "Rutina"),
+            (_TT_CLAVE, "iniciocombate"): partial(self._gen_competencia, "Combate"),
+        }
+        for clave, tipo_nodo in _NODOS_SIMPLES.items():
+            self._despacho[clave] = partial(self._parse_nodo_simple, tipo_nodo)
+        # Despacho de Comando por tipo de token cuando no hay texto fijo
+        self._despacho_tipo = {
+            _TT_COMENT: partial(self._parse_nodo_simple, "Comentario"),
+            # Comparar( y cualquier otra invocación
+            _TT_INVOC: self.parse_invocacion_generica,
+            # Stub para cualquier otra acción compleja aún no modelada
+            _TT_CLAVE: self.parse_accion_stub,
+            # ResultadoExtra ::= "listaRes"
+            _TT_RESULTADO: self.parse_resultado_extra,
+            # Empate ::= "empate"
+            _TT_EMPATE: self.parse_empate,
+            _TT_IDENT: self._parse_identificador,
+            _TT_SYM: partial(self._parse_nodo_simple, "Simbolo"),
+        }
 
     # helpers
+
+    @property
+    def sync_tokens(self) -> frozenset:
+        """Textos (en minúsculas) donde puede detenerse la recuperación de errores."""
+        return self._sync_tokens
+
+    @sync_tokens.setter
+    def sync_tokens(self, valor):
+        self._sync_tokens = frozenset(valor)
+        self._es_sync = None
+
     def peek(self) -> Optional[TokenLexico]:
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        pos = self.pos
+        return self.tokens[pos] if pos < self._ntok else None
 
     def advance(self) -> Optional[TokenLexico]:
-        t = self.peek()
-        if t:
-            self.pos += 1
-        return t
+        pos = self.pos
+        if pos < self._ntok:
+            self.pos = pos + 1
+            return self.tokens[pos]
+        return None
 
     def expect(self, tipo: Optional[TipoToken] = None, texto: Optional[str] = None, mensaje: str = "Token inesperado") -> Optional[TokenLexico]:
+        i = self.pos
+        # Camino rápido: solo comparaciones. Los textos esperados se escriben como los
+        # reconoce el explorador, así que casi siempre basta la comparación exacta
+        if (i < self._ntok and (not tipo or self._tipos[i] is tipo)
+                and (not texto or self._originales[i] == texto or self._textos[i] == texto.lower())):
+            self.pos = i + 1
+            return self.tokens[i]
+        return self._fallo_expect(tipo, texto, mensaje)
+
+    def _fallo_expect(self, tipo: Optional[TipoToken], texto: Optional[str], mensaje: str) -> None:
+        # Camino frío de expect: arma el mensaje, lo reporta y sincroniza
         t = self.peek()
         if not t:
             self._report_error(f"{mensaje}: fin de archivo (EOF)", None)
             return None
-        if tipo and t.tipo_token != tipo:
+        if tipo and t.tipo_token is not tipo:
             self._report_error(f"{mensaje}: se esperaba tipo {tipo.name} y llegó {t.tipo_token.name} ('{t.texto_original}')", t)
-            self.synchronize()
-            return None
-        if texto and t.texto_original.lower() != texto.lower():
+        else:
             self._report_error(f"{mensaje}: se esperaba '{texto}' y llegó '{t.texto_original}'", t)
-            self.synchronize()
-            return None
-        return self.advance()
+        self.synchronize()
+        return None
+
+    def _skip_if(self, texto: str) -> bool:
+        """Consume el token actual si su texto en minúsculas es `texto`."""
+        pos = self.pos
+        if pos < self._ntok and self._textos[pos] == texto:
+            self.pos = pos + 1
+            return True
+        return False
+
+    def _expect_enteros(self, cantidad: int) -> List[Optional[str]]:
+        """Consume `cantidad` números enteros y devuelve sus textos (None donde falte uno)."""
+        tipos = self._tipos
+        originales = self._originales
+        n = self._ntok
+        i = self.pos
+        valores = []
+        while len(valores) < cantidad and i < n and tipos[i] is _TT_NUM:
+            valores.append(originales[i])
+            i += 1
+        self.pos = i
+        # Si falta alguno, expect reporta el error y sincroniza como siempre
+        while len(valores) < cantidad:
+            num = self.expect(_TT_NUM)
+            valores.append(num.texto_original if num else None)
+        return valores
 
     def match_text(self, texto: str) -> bool:
-        t = self.peek()
-        return bool(t and t.texto_original.lower() == texto.lower())
+        pos = self.pos
+        return pos < self._ntok and self._textos[pos] == texto.lower()
 
     def _report_error(self, msg: str, tok: Optional[TokenLexico]):
+        # Con demasiados errores el resto solo es ruido de la recuperación; ya se
+        # agregó el aviso de corte
+        if len(self.errors) > _MAX_ERRORES:
+            return
         linea = tok.numero_linea if tok else None
         columna = tok.posicion_columna if tok else None
         key = (msg, linea, columna)
@@ -63,6 +264,9 @@ class Parser:
         if key in self._error_keys:
             return
         self._error_keys.add(key)
+        if len(self.errors) == _MAX_ERRORES:
+            # Una última entrada avisa que la lista se cortó, en la posición del primer omitido
+            msg = f"Demasiados errores ({_MAX_ERRORES}); se omitieron los restantes"
         self.errors.append({
             "mensaje": msg,
             "linea": linea,
@@ -82,150 +286,147 @@ class Parser:
         2. Si no se encuentra ancla en la misma línea del error, saltar a la siguiente línea y buscar allí.
         3. Limitar el número de pasos para evitar loops.
         """
-        if not self.peek():
+        i = self.pos
+        n = self._ntok
+        if i >= n:
             return
-        start_line = self.peek().numero_linea
-        max_steps = 500
-        steps = 0
-        anchor_types = {TipoToken.DECLARACION_ENTIDAD, TipoToken.ESTRUCTURA_CONTROL_FLUJO, TipoToken.PALABRA_CLAVE}
-        closing_symbols = {'}', ']', ')'}
-        while self.peek() and steps < max_steps:
-            t = self.peek()
+        tipos = self._tipos
+        textos = self._textos
+        lineas = self._lineas
+        es_sync = self._es_sync
+        if es_sync is None:
+            sync = self.sync_tokens
+            es_sync = self._es_sync = [tx in sync for tx in textos]
+        start_line = lineas[i]
+        limite = i + 500  # máximo de pasos
+        while i < n:
+            # Si se alcanzó el límite, consumir todo para evitar bloqueo
+            if i >= limite:
+                i = n
+                break
+            tipo = tipos[i]
             # Condición de ancla por tipo
-            if t.tipo_token in anchor_types:
+            if tipo in _TIPOS_ANCLA:
                 break
             # Invocación como inicio potencial (si cambia de línea respecto al error)
-            if t.tipo_token == TipoToken.INVOCACION_FUNCION and t.numero_linea != start_line:
+            if tipo is _TT_INVOC and lineas[i] != start_line:
                 break
             # Símbolo de cierre como frontera natural
-            if t.tipo_token == TipoToken.SIMBOLO_PUNTUACION and t.texto_original in closing_symbols:
+            if tipo is _TT_SYM and textos[i] in _SIMBOLOS_CIERRE:
                 break
             # Token manual listado en sync_tokens y cambio de línea
-            if t.texto_original.lower() in self.sync_tokens and t.numero_linea != start_line:
+            if es_sync[i] and lineas[i] != start_line:
                 break
-            self.pos += 1
-            steps += 1
-        # Si se alcanzó el límite, consumir todo para evitar bloqueo
-        if steps >= max_steps:
-            while self.peek():
-                self.pos += 1
+            i += 1
+        self.pos = i
+
+    def _trampolin(self, gen):
+        """Ejecuta un generador de bloque y los bloques anidados con una pila explícita.
+
+        Cada `yield` de un generador pide el siguiente Comando de su cuerpo. Si ese
+        comando abre otro bloque (si, Repetir, RepetirHasta, competencias o acciones)
+        se apila su generador; si no, se resuelve con parse_comando. El nodo obtenido se le envía de vuelta
+        al generador que lo pidió, así el anidamiento no consume la pila de Python.
+        """
+        pila = [gen]
+        apilar = pila.append
+        bloque_actual = self._bloque_actual
+        parse_comando = self.parse_comando
+        valor = None
+        while True:
+            try:
+                pila[-1].send(valor)
+            except StopIteration as fin:
+                pila.pop()
+                if not pila:
+                    return fin.value
+                valor = fin.value
+                continue
+            bloque = bloque_actual()
+            if bloque:
+                apilar(bloque)
+                valor = None
+            else:
+                valor = parse_comando()
+
+    def _bloque_actual(self):
+        """Generador del bloque que abre el token actual, o None si el Comando es simple.
+
+        Sigue el mismo orden que parse_comando: primero el texto fijo y luego el tipo.
+        """
+        i = self.pos
+        if i >= self._ntok:
+            return None
+        tipo = self._tipos[i]
+        clave = (tipo, self._textos[i])
+        bloque = self._despacho_bloques.get(clave)
+        if bloque:
+            return bloque()
+        if clave in self._despacho:
+            return None
+        if tipo is _TT_CLAVE:
+            return self._gen_accion_stub()
+        if tipo is _TT_IDENT and self._es_partido(i):
+            return self._gen_partido()
+        return None
 
     # entrada principal
     def parse_program(self) -> asaNode:
-        raiz = asaNode("Programa", "root")
-        while self.peek():
-            nodo = self.parse_comando()
+        return self._trampolin(self._gen_programa())
+
+    def _gen_programa(self):
+        hijos = []
+        agregar = hijos.append
+        n = self._ntok
+        while self.pos < n:
+            nodo = yield
             if nodo:
-                raiz.agregar_hijo(nodo)
+                agregar(nodo)
             else:
                 break
-        return raiz
+        return asaNode("Programa", "root", None, hijos)
 
     # Comando ::= Declarar | Condicional | Repetir | RepetirHasaa | Narrar | Bloque | Dirigir | Comentario
     def parse_comando(self) -> Optional[asaNode]:
-        t = self.peek()
-        if not t:
+        i = self.pos
+        if i >= self._ntok:
             return None
-        # Comentario
-        if t.tipo_token == TipoToken.COMENTARIO:
-            tok = self.advance()
-            return asaNode("Comentario", tok.texto_original, {"linea": tok.numero_linea})
-        # Declaraciones
-        if t.tipo_token == TipoToken.DECLARACION_ENTIDAD:
-            txt = t.texto_original.lower()
-            if txt == "deportista":
-                return self.parse_deportista()
-            if txt == "lista":
-                return self.parse_lista_o_carga()
-        # Control de flujo
-        if t.tipo_token == TipoToken.ESTRUCTURA_CONTROL_FLUJO:
-            txt = t.texto_original.lower()
-            if txt == "si":
-                return self.parse_condicional()
-            if txt == "repetir":
-                return self.parse_repetir()
-            if txt == "repetirhasta":
-                return self.parse_repetir_hasta()
-            if txt in ("finrep","finrephast","endif"):
-                tok = self.advance()
-                return asaNode("Cierre", tok.texto_original, {"linea": tok.numero_linea})
-        # Invocaciones
-        if t.tipo_token == TipoToken.INVOCACION_FUNCION:
-            low = t.texto_original.lower()
-            if low.startswith("narrar"):
-                return self.parse_narrar()
-            if low.startswith("input"):
-                return self.parse_dirigir()
-            if low.startswith("comparar"):
-                return self.parse_invocacion_generica()
-            return self.parse_invocacion_generica()
-        # Acciones y palabras clave de competencia (Partido, Carrera, Combate, Rutina, preparacion, finact, etc.)
-        if t.tipo_token == TipoToken.PALABRA_CLAVE:
-            clave = t.texto_original
-            low = clave.lower()
-            # Cierres simples
-            if low == 'finact':
-                tok = self.advance()
-                return asaNode("FinAct", tok.texto_original, {"linea": tok.numero_linea})
-            if low == 'fincarr':
-                tok = self.advance()
-                return asaNode("FinCarr", tok.texto_original, {"linea": tok.numero_linea})
-            if low == 'finruti':
-                tok = self.advance()
-                return asaNode("FinRuti", tok.texto_original, {"linea": tok.numero_linea})
-            if low == 'fincomb':
-                tok = self.advance()
-                return asaNode("FinComb", tok.texto_original, {"linea": tok.numero_linea})
-            # Entradas a estructuras
-            if low == 'iniciocarrera':
-                return self.parse_carrera()
-            if low == 'iniciorutina':
-                return self.parse_rutina()
-            if low == 'iniciocombate':
-                return self.parse_combate()
-            # Otros keywords se devuelven como nodos simples (preparacion, ejecutar, correr, finprep etc.)
-            if low in ('preparacion','ejecutar','correr','finprep'):
-                tok = self.advance()
-                return asaNode("Clave", tok.texto_original, {"linea": tok.numero_linea})
-            # Stub para cualquier otra acción compleja aún no modelada
-            return self.parse_accion_stub()
-        # Resultado ::= "Resultado" Numero "-" Numero
-        if t.tipo_token == TipoToken.TIPO_DATO_DOMINIO and t.texto_original == "Resultado":
-            return self.parse_resultado()
-        # ResultadoExtra ::= "listaRes"
-        if t.tipo_token == TipoToken.RESULTADO_ADICIONAL:
-            return self.parse_resultado_extra()
-        # Empate ::= "empate"
-        if t.tipo_token == TipoToken.CONDICION_EMPATE:
-            return self.parse_empate()
-        # Partido: patrón Identificador 'vs' Identificador al inicio de línea
-        if t.tipo_token == TipoToken.NOMBRE_IDENTIFICADOR and self.pos + 1 < len(self.tokens):
-            nxt = self.tokens[self.pos + 1]
-            if nxt.tipo_token == TipoToken.OPERADOR_ESPECIAL and nxt.texto_original.lower() == 'vs':
-                return self.parse_partido()
-        # Identificador / símbolo para patrones avanzados (lista.agregar) aislados
-        if t.tipo_token == TipoToken.NOMBRE_IDENTIFICADOR:
-            tok = self.advance()
-            return asaNode("Identificador", tok.texto_original, {"linea": tok.numero_linea})
-        if t.tipo_token == TipoToken.SIMBOLO_PUNTUACION:
-            tok = self.advance()
-            return asaNode("Simbolo", tok.texto_original, {"linea": tok.numero_linea})
+        tipo = self._tipos[i]
+        # Producciones con texto fijo y, si no hay, la producción general del tipo de token
+        produccion = self._despacho.get((tipo, self._textos[i])) or self._despacho_tipo.get(tipo)
+        if produccion:
+            return produccion()
         # Fallback
-        tok = self.advance()
-        self._report_error("Token fuera de producción Comando", tok)
-        return asaNode("Unknown", tok.texto_original, {"linea": tok.numero_linea})
+        t = self.tokens[i]
+        self.pos = i + 1
+        self._report_error("Token fuera de producción Comando", t)
+        return asaNode("Unknown", t.texto_original, {"linea": t.numero_linea})
+
+    def _parse_nodo_simple(self, tipo_nodo: str) -> asaNode:
+        # Nodos de un solo token (cierres, claves, comentarios, símbolos)
+        i = self.pos
+        self.pos = i + 1
+        return asaNode(tipo_nodo, self._originales[i], {"linea": self._lineas[i]})
+
+    def _es_partido(self, i: int) -> bool:
+        # Partido: el identificador en i va seguido de 'vs'
+        i += 1
+        return i < self._ntok and self._tipos[i] is _TT_ESPECIAL and self._textos[i] == 'vs'
+
+    def _parse_identificador(self) -> asaNode:
+        # Partido: patrón Identificador 'vs' Identificador al inicio de línea
+        if self._es_partido(self.pos):
+            return self.parse_partido()
+        # Identificador para patrones avanzados (lista.agregar) aislados
+        return self._parse_nodo_simple("Identificador")
 
     # Declaraciones
     def parse_deportista(self) -> asaNode:
-        tok_decl = self.expect(TipoToken.DECLARACION_ENTIDAD, texto="Deportista")
-        nombre = self.expect(TipoToken.NOMBRE_IDENTIFICADOR)
-        est = []
-        for _ in range(3):
-            num = self.expect(TipoToken.NUMERO_ENTERO)
-            # proteger acceso si num es None
-            est.append(num.texto_original if num else None)
-        deporte = self.expect(TipoToken.NOMBRE_IDENTIFICADOR)
-        pais = self.expect(TipoToken.NOMBRE_IDENTIFICADOR)
+        tok_decl = self.expect(_TT_DECL, texto="Deportista")
+        nombre = self.expect(_TT_IDENT)
+        est = self._expect_enteros(3)
+        deporte = self.expect(_TT_IDENT)
+        pais = self.expect(_TT_IDENT)
 
         # Si la declaración base 'Deportista' faltó, reportar y devolver nodo de error
         if not tok_decl:
@@ -241,84 +442,70 @@ class Parser:
         }
 
         # Si faltan elementos críticos, reportar pero no lanzar excepción
-        if not nombre or not deporte or not pais or any(x is None for x in est):
+        if not (nombre and deporte and pais) or None in est:
             self._report_error("Declaración 'Deportista' incompleta (faltan campos)", tok_decl)
             return asaNode("ErrorSintactico", "DeportistaIncompleto", atributos)
 
         return asaNode("Deportista", atributos["nombre"], atributos)
 
+    def _es_entrada_deportista(self, i: int) -> bool:
+        """Indica si desde la posición i hay una entrada de carga: nombre N N N deporte pais."""
+        if i + 5 >= self._ntok:
+            return False
+        tipos = self._tipos
+        return (tipos[i] is _TT_IDENT and tipos[i + 1] is _TT_NUM and tipos[i + 2] is _TT_NUM
+                and tipos[i + 3] is _TT_NUM and tipos[i + 4] is _TT_IDENT and tipos[i + 5] is _TT_IDENT)
+
     def parse_lista_o_carga(self) -> asaNode:
-        tok_lista = self.expect(TipoToken.DECLARACION_ENTIDAD, texto="Lista")
+        tok_lista = self.expect(_TT_DECL, texto="Lista")
         if not tok_lista:
             return asaNode("ErrorSintactico", "Lista", {"linea": None})
         
         print(f"[SINTAXIS] Parseando Lista en línea {tok_lista.numero_linea}")
         # Lookahead para decidir: ¿Es declaración simple o carga masiva?
-        if self.peek() and self.peek().tipo_token == TipoToken.DECLARACION_ENTIDAD and self.peek().texto_original.lower() == "deportista":
-            # Peek ahead: después de Deportista, ¿viene un nombre simple o nombre+números?
-            saved_pos = self.pos
-            tipo_token = self.advance()  # consume 'Deportista'
-            
-            # Si el siguiente token es nombre, puede ser carga masiva o declaración simple
-            if (self.peek() and self.peek().tipo_token == TipoToken.NOMBRE_IDENTIFICADOR):
-                nombre_token = self.peek()
-                # Intentar mirar un token más adelante para detectar carga masiva
-                # Carga masiva: nombre NUMERO NUMERO NUMERO ...
-                # Declaración simple: nombre (y luego EOF o comentario o siguiente comando)
-                
-                # Hacemos lookahead: si después del nombre viene un número, es carga masiva
-                self.advance()  # consume el nombre
-                es_carga_masiva = False
-                if self.peek() and self.peek().tipo_token == TipoToken.NUMERO_ENTERO:
-                    es_carga_masiva = True
-                
-                # Restaurar posición a después de 'Deportista'
+        tipos = self._tipos
+        textos = self._textos
+        n = self._ntok
+        saved_pos = self.pos
+        if saved_pos < n and tipos[saved_pos] is _TT_DECL and textos[saved_pos] == "deportista":
+            # Carga masiva: Deportista nombre NUMERO NUMERO NUMERO ...
+            # Declaración simple: Deportista nombre (y luego otro comando)
+            # Se mira por índice sin consumir tokens
+            if not (saved_pos + 1 < n and tipos[saved_pos + 1] is _TT_IDENT):
+                # Sin nombre después de 'Deportista': queda consumido
+                self.pos = saved_pos + 1
+            elif saved_pos + 2 < n and tipos[saved_pos + 2] is _TT_NUM:
+                # Parsear carga masiva
+                deportistas = []
+                originales = self._originales
+                # Las entradas empiezan después de 'Deportista'
+                i = saved_pos + 1
+                # Cada entrada se revisa completa antes de consumirla, así no hay
+                # que retroceder ni reportar errores
+                while self._es_entrada_deportista(i):
+                    deportistas.append({
+                        "nombre": originales[i],
+                        "estadisticas": originales[i + 1:i + 4],
+                        "deporte": originales[i + 4],
+                        "pais": originales[i + 5]
+                    })
+                    i += 6
+                self.pos = i
+
+                if deportistas:
+                    return asaNode("CargaDeportistas", "Lista Deportista", {"deportistas": deportistas, "linea": tok_lista.numero_linea})
+                # No era carga masiva válida, retroceder a posición original
                 self.pos = saved_pos
-                
-                if es_carga_masiva:
-                    # Parsear carga masiva
-                    deportistas = []
-                    while self.peek() and self.peek().tipo_token == TipoToken.NOMBRE_IDENTIFICADOR:
-                        start_pos = self.pos
-                        nombre = self.advance()
-                        numeros = []
-                        for _ in range(3):
-                            if self.peek() and self.peek().tipo_token == TipoToken.NUMERO_ENTERO:
-                                numeros.append(self.advance().texto_original)
-                            else:
-                                self.pos = start_pos
-                                break
-                        if len(numeros) != 3:
-                            break
-                        deporte = self.expect(TipoToken.NOMBRE_IDENTIFICADOR)
-                        pais = self.expect(TipoToken.NOMBRE_IDENTIFICADOR)
-                        if not (deporte and pais):
-                            break
-                        deportistas.append({
-                            "nombre": nombre.texto_original,
-                            "estadisticas": numeros,
-                            "deporte": deporte.texto_original,
-                            "pais": pais.texto_original
-                        })
-                    
-                    if deportistas:
-                        return asaNode("CargaDeportistas", "Lista Deportista", {"deportistas": deportistas, "linea": tok_lista.numero_linea})
-                    else:
-                        # No era carga masiva válida, retroceder a posición original
-                        self.pos = saved_pos
-                else:
-                    # Es declaración simple: ya estamos en saved_pos (después de Deportista)
-                    pass
-        
+
         # Declaración simple: Lista Tipo Nombre
         # El tipo puede ser DECLARACION_ENTIDAD (Deportista) o NOMBRE_IDENTIFICADOR
-        tipo = None
-        if self.peek() and self.peek().tipo_token == TipoToken.DECLARACION_ENTIDAD and self.peek().texto_original.lower() == "deportista":
+        i = self.pos
+        if i < n and tipos[i] is _TT_DECL and textos[i] == "deportista":
             tipo = self.advance()
         else:
-            tipo = self.expect(TipoToken.NOMBRE_IDENTIFICADOR, mensaje="Tipo de lista inválido")
+            tipo = self.expect(_TT_IDENT, mensaje="Tipo de lista inválido")
         
-        nombre = self.expect(TipoToken.NOMBRE_IDENTIFICADOR, mensaje="Nombre de lista faltante")
+        nombre = self.expect(_TT_IDENT, mensaje="Nombre de lista faltante")
         atributos = {
             "tipo": tipo.texto_original if tipo else None,
             "nombre": nombre.texto_original if nombre else None,
@@ -329,17 +516,9 @@ class Parser:
 
     # Invocaciones y funciones
     def parse_narrar(self) -> asaNode:
-        tok = self.expect(TipoToken.INVOCACION_FUNCION)
+        tok = self.expect(_TT_INVOC)
         # esperamos narrar( Nombre )
-        args = []
-        while self.peek() and self.peek().texto_original != ")":
-            if self.peek().tipo_token == TipoToken.NOMBRE_IDENTIFICADOR:
-                args.append(self.advance().texto_original)
-            else:
-                self._report_error("Argumento de narrar debe ser identificador (Nombre)", self.peek())
-                self.advance()
-        if self.peek() and self.peek().texto_original == ")":
-            self.advance()
+        args = self._collect_args(solo_identificadores=True)
         # validar aridad 1
         if len(args) != 1:
             self._report_error(f"narrar requiere exactamente 1 Nombre, se encontró {len(args)}", tok)
@@ -349,37 +528,58 @@ class Parser:
         return asaNode("Narrar", contenido, {"args": args, "linea": linea})
 
     def parse_dirigir(self) -> asaNode:
-        tok = self.expect(TipoToken.INVOCACION_FUNCION)  # input(
-        args = []
-        while (p := self.peek()) and p.texto_original != ")":
-            if p.tipo_token == TipoToken.SIMBOLO_PUNTUACION and p.texto_original == ",":
-                self.advance(); continue
-            args.append(self.advance().texto_original)
-        if self.peek() and self.peek().texto_original == ")":
-            self.advance()
+        tok = self.expect(_TT_INVOC)  # input(
+        args = self._collect_args()
         contenido = (tok.texto_original[:-1] if tok and tok.texto_original.endswith('(') else (tok.texto_original if tok else "input"))
         linea = tok.numero_linea if tok else None
         return asaNode("Dirigir", contenido, {"args": args, "linea": linea})
 
     def parse_invocacion_generica(self) -> asaNode:
-        tok = self.expect(TipoToken.INVOCACION_FUNCION)
+        tok = self.expect(_TT_INVOC)
         nombre = (tok.texto_original[:-1] if tok and tok.texto_original.endswith('(') else (tok.texto_original if tok else "invocacion"))
-        args = []
-        while (p := self.peek()) and p.texto_original != ")":
-            if p.tipo_token == TipoToken.SIMBOLO_PUNTUACION and p.texto_original == ",":
-                self.advance(); continue
-            args.append(self.advance().texto_original)
-        if self.peek() and self.peek().texto_original == ")":
-            self.advance()
+        args = self._collect_args()
         linea = tok.numero_linea if tok else None
         return asaNode("Invocacion", nombre, {"args": args, "linea": linea})
 
+    def _collect_args(self, solo_identificadores: bool = False) -> List[str]:
+        """Recolecta los argumentos de una invocación hasta ')' y consume el cierre.
+
+        Por defecto se omiten las comas. Con solo_identificadores (narrar) todo token
+        que no sea un Nombre se reporta como error y se descarta.
+        """
+        tipos = self._tipos
+        originales = self._originales
+        roles = self._rol_arg
+        if roles is None:
+            roles = self._rol_arg = [
+                2 if tx == ")" else 1 if tx == "," and tp is _TT_SYM else 0
+                for tp, tx in zip(tipos, originales)
+            ]
+        i = self.pos
+        n = self._ntok
+        args = []
+        while i < n:
+            rol = roles[i]
+            if rol == 2:
+                i += 1
+                break
+            if solo_identificadores:
+                if tipos[i] is _TT_IDENT:
+                    args.append(originales[i])
+                else:
+                    self._report_error("Argumento de narrar debe ser identificador (Nombre)", self.tokens[i])
+            elif rol == 0:
+                args.append(originales[i])
+            i += 1
+        self.pos = i
+        return args
+
     # Resultado ::= "Resultado" Numero "-" Numero
     def parse_resultado(self) -> asaNode:
-        tok_res = self.expect(TipoToken.TIPO_DATO_DOMINIO, texto="Resultado", mensaje="Se esperaba 'Resultado'")
-        num1 = self.expect(TipoToken.NUMERO_ENTERO, mensaje="Resultado requiere primer número")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="-", mensaje="Resultado requiere '-' entre números")
-        num2 = self.expect(TipoToken.NUMERO_ENTERO, mensaje="Resultado requiere segundo número")
+        tok_res = self.expect(_TT_DOMINIO, texto="Resultado", mensaje="Se esperaba 'Resultado'")
+        num1 = self.expect(_TT_NUM, mensaje="Resultado requiere primer número")
+        self.expect(_TT_SYM, texto="-", mensaje="Resultado requiere '-' entre números")
+        num2 = self.expect(_TT_NUM, mensaje="Resultado requiere segundo número")
         atributos = {
             "linea": tok_res.numero_linea if tok_res else None,
             "valores": [num1.texto_original if num1 else None, num2.texto_original if num2 else None]
@@ -388,194 +588,125 @@ class Parser:
 
     # ResultadoExtra ::= "listaRes"
     def parse_resultado_extra(self) -> asaNode:
-        tok = self.expect(TipoToken.RESULTADO_ADICIONAL, texto="listaRes", mensaje="Se esperaba 'listaRes'")
+        tok = self.expect(_TT_RESULTADO, texto="listaRes", mensaje="Se esperaba 'listaRes'")
         return asaNode("ResultadoExtra", tok.texto_original if tok else "listaRes", {"linea": tok.numero_linea if tok else None})
 
     # Empate ::= "empate"
     def parse_empate(self) -> asaNode:
-        tok = self.expect(TipoToken.CONDICION_EMPATE, texto="empate", mensaje="Se esperaba 'empate'")
+        tok = self.expect(_TT_EMPATE, texto="empate", mensaje="Se esperaba 'empate'")
         return asaNode("Empate", tok.texto_original if tok else "empate", {"linea": tok.numero_linea if tok else None})
 
     # Partido ::= PaisA 'vs' PaisB Accion* [Empate] Resultado ResultadoExtra* 'finact'
     def parse_partido(self) -> asaNode:
-        paisA = self.expect(TipoToken.NOMBRE_IDENTIFICADOR, mensaje="Partido requiere primer país")
-        self.expect(TipoToken.OPERADOR_ESPECIAL, texto="vs", mensaje="Partido requiere 'vs' entre países")
-        paisB = self.expect(TipoToken.NOMBRE_IDENTIFICADOR, mensaje="Partido requiere segundo país")
+        return self._trampolin(self._gen_partido())
+
+    def _gen_partido(self):
+        paisA = self.expect(_TT_IDENT, mensaje="Partido requiere primer país")
+        self.expect(_TT_ESPECIAL, texto="vs", mensaje="Partido requiere 'vs' entre países")
+        paisB = self.expect(_TT_IDENT, mensaje="Partido requiere segundo país")
+        hijos = yield from self._gen_cuerpo_competencia("Partido", "finact", acepta_empate=True)
+        atributos = {
+            "paisA": paisA.texto_original if paisA else None,
+            "paisB": paisB.texto_original if paisB else None,
+            "linea": paisA.numero_linea if paisA else (paisB.numero_linea if paisB else None)
+        }
+        return asaNode("Partido", f"{atributos['paisA']} vs {atributos['paisB']}", atributos, hijos)
+
+    # Carrera ::= 'InicioCarrera' Accion* Resultado ResultadoExtra* 'finCarr'
+    def parse_carrera(self) -> asaNode:
+        return self._trampolin(self._gen_competencia("Carrera"))
+
+    # Rutina ::= 'InicioRutina' Accion* Resultado ResultadoExtra* 'finRuti'
+    def parse_rutina(self) -> asaNode:
+        return self._trampolin(self._gen_competencia("Rutina"))
+
+    # Combate ::= 'InicioCombate' Accion* Resultado ResultadoExtra* 'finComb'
+    def parse_combate(self) -> asaNode:
+        return self._trampolin(self._gen_competencia("Combate"))
+
+    def _gen_competencia(self, nombre: str):
+        # Carrera, Rutina y Combate solo difieren en sus palabras de inicio y cierre
+        apertura, cierre = _COMPETENCIAS[nombre]
+        inicio = self.expect(_TT_CLAVE, texto=apertura, mensaje=f"Se esperaba '{apertura}'")
+        hijos = yield from self._gen_cuerpo_competencia(nombre, cierre, acepta_empate=False)
+        return asaNode(nombre, apertura, {"linea": inicio.numero_linea if inicio else None}, hijos)
+
+    def _gen_cuerpo_competencia(self, nombre: str, cierre: str, acepta_empate: bool):
+        """Cuerpo común de las competencias: Accion* [Empate] Resultado ResultadoExtra* cierre.
+
+        Devuelve los hijos en orden: acciones, empate, resultado y extras.
+        """
+        cierre_min = cierre.lower()
+        tipos = self._tipos
+        textos = self._textos
+        n = self._ntok
+        tt_dominio, tt_empate, tt_clave = _TT_DOMINIO, _TT_EMPATE, _TT_CLAVE
         acciones = []
         empate_node = None
         resultado_node = None
         extras = []
-        # Consumir acciones hasta ver Resultado / finact
-        while self.peek():
-            p = self.peek()
-            low = p.texto_original.lower()
+        # Consumir acciones hasta ver Resultado / cierre
+        while (i := self.pos) < n:
+            tipo = tipos[i]
+            low = textos[i]
             # Resultado marca transición a etapa final
-            if p.tipo_token == TipoToken.TIPO_DATO_DOMINIO and low == 'resultado':
+            if tipo is tt_dominio and low == 'resultado':
                 resultado_node = self.parse_resultado()
+                if not acepta_empate:
+                    while self.pos < n and textos[self.pos] == 'listares':
+                        extras.append(self.parse_resultado_extra())
+                    break
                 # Posibles extras y/o empate después del resultado
-                while self.peek() and self.peek().texto_original.lower() in ("listares","empate"):
-                    if self.peek().tipo_token == TipoToken.RESULTADO_ADICIONAL:
+                while (j := self.pos) < n and textos[j] in _TRAS_RESULTADO_PARTIDO:
+                    if tipos[j] is _TT_RESULTADO:
                         extras.append(self.parse_resultado_extra())
                         continue
-                    if self.peek().tipo_token == TipoToken.CONDICION_EMPATE:
+                    if tipos[j] is _TT_EMPATE:
                         # Si aparece empate después del resultado lo aceptamos pero advertimos
                         if not empate_node:
                             empate_node = self.parse_empate()
                         else:
-                            self._report_error("Empate duplicado en Partido", self.peek())
+                            self._report_error(f"Empate duplicado en {nombre}", self.tokens[j])
+                            self.pos = j + 1  # se descarta para no quedar en el mismo token
                         continue
                     break
                 break  # tras resultado y extras pasamos a cierre
-            if p.tipo_token == TipoToken.CONDICION_EMPATE and low == 'empate':
+            if acepta_empate and tipo is tt_empate and low == 'empate':
                 if not empate_node:
                     empate_node = self.parse_empate()
                 else:
-                    self._report_error("Empate duplicado en Partido", p)
+                    self._report_error(f"Empate duplicado en {nombre}", self.tokens[i])
+                    self.pos = i + 1  # se descarta para no quedar en el mismo token
                 continue
-            if p.tipo_token == TipoToken.PALABRA_CLAVE and low == 'finact':
+            if tipo is tt_clave and low == cierre_min:
                 break
-            # Acción interna genérica: reutilizamos parse_comando para nodos contenidos
-            acc = self.parse_comando()
+            # Acción interna genérica: se pide el siguiente Comando al trampolín
+            acc = yield
             if acc:
                 acciones.append(acc)
             else:
                 break
-        # Cierre obligatorio finact
-        if self.peek() and self.peek().tipo_token == TipoToken.PALABRA_CLAVE and self.peek().texto_original.lower() == 'finact':
-            self.advance()  # consume finact
+        # Cierre obligatorio
+        i = self.pos
+        if i < n and tipos[i] is _TT_CLAVE and textos[i] == cierre_min:
+            self.pos = i + 1
         else:
-            self._report_error("Se esperaba 'finact' al final de Partido", self.peek())
+            self._report_error(f"Se esperaba '{cierre}' al final de {nombre}", self.peek())
         if not resultado_node:
-            self._report_error("Partido requiere 'Resultado' antes de 'finact'", self.peek())
-        atributos = {
-            "paisA": paisA.texto_original if paisA else None,
-            "paisB": paisB.texto_original if paisB else None,
-            "linea": paisA.numero_linea if paisA else (paisB.numero_linea if paisB else None)
-        }
-        nodo = asaNode("Partido", f"{atributos['paisA']} vs {atributos['paisB']}", atributos)
-        for a in acciones:
-            nodo.agregar_hijo(a)
+            self._report_error(f"{nombre} requiere 'Resultado' antes de '{cierre}'", self.peek())
+        hijos = acciones
         if empate_node:
-            nodo.agregar_hijo(empate_node)
-        if resultado_node:
-            nodo.agregar_hijo(resultado_node)
-        for e in extras:
-            nodo.agregar_hijo(e)
-        return nodo
-
-    # Carrera ::= 'InicioCarrera' Accion* Resultado ResultadoExtra* 'finCarr'
-    def parse_carrera(self) -> asaNode:
-        inicio = self.expect(TipoToken.PALABRA_CLAVE, texto="InicioCarrera", mensaje="Se esperaba 'InicioCarrera'")
-        acciones = []
-        resultado_node = None
-        extras = []
-        while self.peek():
-            p = self.peek()
-            low = p.texto_original.lower()
-            if p.tipo_token == TipoToken.TIPO_DATO_DOMINIO and low == 'resultado':
-                resultado_node = self.parse_resultado()
-                while self.peek() and self.peek().texto_original.lower() == 'listares':
-                    extras.append(self.parse_resultado_extra())
-                break
-            if p.tipo_token == TipoToken.PALABRA_CLAVE and low == 'fincarr':
-                break
-            acc = self.parse_comando()
-            if acc:
-                acciones.append(acc)
-            else:
-                break
-        if self.peek() and self.peek().tipo_token == TipoToken.PALABRA_CLAVE and self.peek().texto_original.lower() == 'fincarr':
-            self.advance()
-        else:
-            self._report_error("Se esperaba 'finCarr' al final de Carrera", self.peek())
-        if not resultado_node:
-            self._report_error("Carrera requiere 'Resultado' antes de 'finCarr'", self.peek())
-        atributos = {"linea": inicio.numero_linea if inicio else None}
-        nodo = asaNode("Carrera", "InicioCarrera", atributos)
-        for a in acciones:
-            nodo.agregar_hijo(a)
-        if resultado_node:
-            nodo.agregar_hijo(resultado_node)
-        for e in extras:
-            nodo.agregar_hijo(e)
-        return nodo
-
-    # Rutina ::= 'InicioRutina' Accion* Resultado ResultadoExtra* 'finRuti'
-    def parse_rutina(self) -> asaNode:
-        inicio = self.expect(TipoToken.PALABRA_CLAVE, texto="InicioRutina", mensaje="Se esperaba 'InicioRutina'")
-        acciones = []
-        resultado_node = None
-        extras = []
-        while self.peek():
-            p = self.peek()
-            low = p.texto_original.lower()
-            if p.tipo_token == TipoToken.TIPO_DATO_DOMINIO and low == 'resultado':
-                resultado_node = self.parse_resultado()
-                while self.peek() and self.peek().texto_original.lower() == 'listares':
-                    extras.append(self.parse_resultado_extra())
-                break
-            if p.tipo_token == TipoToken.PALABRA_CLAVE and low == 'finruti':
-                break
-            acc = self.parse_comando()
-            if acc:
-                acciones.append(acc)
-            else:
-                break
-        if self.peek() and self.peek().tipo_token == TipoToken.PALABRA_CLAVE and self.peek().texto_original.lower() == 'finruti':
-            self.advance()
-        else:
-            self._report_error("Se esperaba 'finRuti' al final de Rutina", self.peek())
-        if not resultado_node:
-            self._report_error("Rutina requiere 'Resultado' antes de 'finRuti'", self.peek())
-        atributos = {"linea": inicio.numero_linea if inicio else None}
-        nodo = asaNode("Rutina", "InicioRutina", atributos)
-        for a in acciones:
-            nodo.agregar_hijo(a)
-        if resultado_node:
-            nodo.agregar_hijo(resultado_node)
-        for e in extras:
-            nodo.agregar_hijo(e)
-        return nodo
-
-    # Combate ::= 'InicioCombate' Accion* Resultado ResultadoExtra* 'finComb'
-    def parse_combate(self) -> asaNode:
-        inicio = self.expect(TipoToken.PALABRA_CLAVE, texto="InicioCombate", mensaje="Se esperaba 'InicioCombate'")
-        acciones = []
-        resultado_node = None
-        extras = []
-        while self.peek():
-            p = self.peek()
-            low = p.texto_original.lower()
-            if p.tipo_token == TipoToken.TIPO_DATO_DOMINIO and low == 'resultado':
-                resultado_node = self.parse_resultado()
-                while self.peek() and self.peek().texto_original.lower() == 'listares':
-                    extras.append(self.parse_resultado_extra())
-                break
-            if p.tipo_token == TipoToken.PALABRA_CLAVE and low == 'fincomb':
-                break
-            acc = self.parse_comando()
-            if acc:
-                acciones.append(acc)
-            else:
-                break
-        if self.peek() and self.peek().tipo_token == TipoToken.PALABRA_CLAVE and self.peek().texto_original.lower() == 'fincomb':
-            self.advance()
-        else:
-            self._report_error("Se esperaba 'finComb' al final de Combate", self.peek())
-        if not resultado_node:
-            self._report_error("Combate requiere 'Resultado' antes de 'finComb'", self.peek())
-        atributos = {"linea": inicio.numero_linea if inicio else None}
-        nodo = asaNode("Combate", "InicioCombate", atributos)
-        for a in acciones:
-            nodo.agregar_hijo(a)
+            hijos.append(empate_node)
         if resultado_node:
-            nodo.agregar_hijo(resultado_node)
-        for e in extras:
-            nodo.agregar_hijo(e)
-        return nodo
+            hijos.append(resultado_node)
+        hijos.extend(extras)
+        return hijos
 
     # Stub general para acciones de competencia (Partido, Carrera, Combate, Rutina)
     def parse_accion_stub(self) -> asaNode:
+        return self._trampolin(self._gen_accion_stub())
+
+    def _gen_accion_stub(self):
         inicio = self.advance()
         if not inicio:
             # Nothing to consume, return an error node
@@ -583,12 +714,13 @@ class Parser:
             return asaNode("ErrorSintactico", "AccionStub", {"linea": None})
         hijos = []
         # Recolectar tokens hasta encontrar un terminador conocido o cierre de bloque
-        terminadores = {"finact","fincarr","finruti","finprep"}
-        while self.peek() and self.peek().texto_original.lower() not in terminadores:
+        textos = self._textos
+        n = self._ntok
+        while self.pos < n and (low := textos[self.pos]) not in _FIN_ACCION:
             # detener si vemos resultado/empate ya manejado afuera (permitir parse_comando trate esos)
-            if self.peek().texto_original.lower() in ("resultado","listares","empate"):
+            if low in _FIN_ACCION_EXTERNO:
                 break
-            child = self.parse_comando()
+            child = yield
             if child:
                 hijos.append(child)
             else:
@@ -597,142 +729,169 @@ class Parser:
 
     # Condicional
     def parse_condicional(self) -> asaNode:
-        si_tok = self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="si")
+        return self._trampolin(self._gen_condicional())
+
+    def _gen_condicional(self):
+        si_tok = self.expect(_TT_CTRL, texto="si")
         condicion = self.parse_condicion_expresion()
-        entonces_tok = self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="entonces", mensaje="Falta 'entonces' en condicional")
-        llave_ap = self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="{", mensaje="Falta '{' de apertura en condicional")
+        entonces_tok = self.expect(_TT_CTRL, texto="entonces", mensaje="Falta 'entonces' en condicional")
+        llave_ap = self.expect(_TT_SYM, texto="{", mensaje="Falta '{' de apertura en condicional")
+        textos = self._textos
+        n = self._ntok
         cuerpo = []
-        while self.peek() and self.peek().texto_original.lower() not in ("}", "sino", "endif"):
-            n = self.parse_comando()
-            if n:
-                cuerpo.append(n)
+        while self.pos < n and textos[self.pos] not in _FIN_CONDICIONAL:
+            c = yield
+            if c:
+                cuerpo.append(c)
             else:
                 break
         sino_bloque = None
-        if self.peek() and self.peek().texto_original.lower() == "sino":
-            self.advance()
-            self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="{", mensaje="Falta '{' después de 'sino'")
+        if self._skip_if("sino"):
+            self.expect(_TT_SYM, texto="{", mensaje="Falta '{' después de 'sino'")
             sino_bloque = []
-            while self.peek() and self.peek().texto_original.lower() not in ("}", "endif"):
-                s = self.parse_comando()
+            while self.pos < n and textos[self.pos] not in _FIN_SINO:
+                s = yield
                 if s: sino_bloque.append(s)
                 else: break
-            self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="}", mensaje="Falta '}' de cierre en bloque 'sino'")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="}", mensaje="Falta '}' de cierre en condicional principal")
-        self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="endif", mensaje="Falta 'endif' al final de condicional")
-        nodo = asaNode("Condicional", "si", {"condicion": condicion.contenido, "linea": si_tok.numero_linea if si_tok else None})
-        nodo.hijos = cuerpo
+            self.expect(_TT_SYM, texto="}", mensaje="Falta '}' de cierre en bloque 'sino'")
+        self.expect(_TT_SYM, texto="}", mensaje="Falta '}' de cierre en condicional principal")
+        self.expect(_TT_CTRL, texto="endif", mensaje="Falta 'endif' al final de condicional")
+        nodo = asaNode("Condicional", "si", {"condicion": condicion.contenido, "linea": si_tok.numero_linea if si_tok else None}, cuerpo)
         if sino_bloque:
-            nodo.agregar_hijo(asaNode("Sino","",{},sino_bloque))
+            nodo.agregar_hijo(asaNode("Sino", "", None, sino_bloque))
         return nodo
 
     def parse_condicion_expresion(self) -> asaNode:
         left = self.parse_expression()
-        if (p := self.peek()) and p.tipo_token == TipoToken.OPERADOR_COMPARACION:
-            op = self.advance()
+        i = self.pos
+        if i < self._ntok and self._tipos[i] is _TT_COMP:
+            self.pos = i + 1
             right = self.parse_expression()
-            node = asaNode("Condicion", f"{left.contenido} {op.texto_original} {right.contenido}", {}, [left, asaNode("Op", op.texto_original), right])
-            return node
+            op = self._originales[i]
+            return asaNode("Condicion", f"{left.contenido} {op} {right.contenido}", None, [left, asaNode("Op", op), right])
         return left
 
     # Repetir y RepetirHasaa
     def parse_repetir(self) -> asaNode:
-        tok = self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="Repetir")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="(", mensaje="Falta '(' en Repetir")
-        count = self.expect(TipoToken.NUMERO_ENTERO, mensaje="Repetir requiere un número entero")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto=")", mensaje="Falta ')' en Repetir")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="[", mensaje="Falta '[' en bloque Repetir")
-        cuerpo = []
-        while self.peek() and self.peek().texto_original.lower() not in ("finrep", "]"):
-            n = self.parse_comando()
-            if n: cuerpo.append(n)
-            else: break
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="]", mensaje="Falta ']' en Repetir")
-        self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="FinRep", mensaje="Falta 'FinRep' después del bloque Repetir")
-        return asaNode("Repetir", count.texto_original if count else "", {}, cuerpo)
+        return self._trampolin(self._gen_repetir("Repetir"))
 
     def parse_repetir_hasta(self) -> asaNode:
-        tok = self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="RepetirHasta")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="(", mensaje="Falta '(' en RepetirHasta")
-        condicion = self.parse_condicion_expresion()
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto=")", mensaje="Falta ')' en RepetirHasta")
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="[", mensaje="Falta '[' en bloque RepetirHasta")
+        return self._trampolin(self._gen_repetir("RepetirHasta"))
+
+    def _gen_repetir(self, palabra: str):
+        # Repetir '(' Numero ')' y RepetirHasta '(' Condicion ')' comparten el resto del bloque
+        fin_cuerpo, cierre, mensaje_cierre = _BLOQUES_REPETIR[palabra]
+        self.expect(_TT_CTRL, texto=palabra)
+        self.expect(_TT_SYM, texto="(", mensaje=f"Falta '(' en {palabra}")
+        if palabra == "Repetir":
+            count = self.expect(_TT_NUM, mensaje="Repetir requiere un número entero")
+            contenido = count.texto_original if count else ""
+        else:
+            contenido = self.parse_condicion_expresion().contenido
+        self.expect(_TT_SYM, texto=")", mensaje=f"Falta ')' en {palabra}")
+        self.expect(_TT_SYM, texto="[", mensaje=f"Falta '[' en bloque {palabra}")
+        textos = self._textos
+        n = self._ntok
         cuerpo = []
-        while self.peek() and self.peek().texto_original.lower() not in ("finrephast", "]"):
-            n = self.parse_comando()
-            if n: cuerpo.append(n)
+        while self.pos < n and textos[self.pos] not in fin_cuerpo:
+            c = yield
+            if c: cuerpo.append(c)
             else: break
-        self.expect(TipoToken.SIMBOLO_PUNTUACION, texto="]", mensaje="Falta ']' en RepetirHasta")
-        self.expect(TipoToken.ESTRUCTURA_CONTROL_FLUJO, texto="FinRepHast", mensaje="Falta 'FinRepHast' en RepetirHasta")
-        return asaNode("RepetirHasta", condicion.contenido, {}, cuerpo)
+        self.expect(_TT_SYM, texto="]", mensaje=f"Falta ']' en {palabra}")
+        self.expect(_TT_CTRL, texto=cierre, mensaje=mensaje_cierre)
+        return asaNode(palabra, contenido, None, cuerpo)
 
     # Expresiones (precedencia)
     def parse_expression(self) -> asaNode:
-        return self.parse_comparison()
-
-    def parse_comparison(self) -> asaNode:
-        node = self.parse_add()
-        while (p := self.peek()) and p.tipo_token == TipoToken.OPERADOR_COMPARACION:
-            op = self.advance()
-            right = self.parse_add()
-            node = asaNode("BinaryOp", op.texto_original, {}, [node, right])
-        return node
-
-    def parse_add(self) -> asaNode:
-        node = self.parse_mul()
-        while (p := self.peek()) and p.tipo_token == TipoToken.OPERADOR_ARITMETICO and p.texto_original in ("+", "-"):
-            op = self.advance()
-            right = self.parse_mul()
-            node = asaNode("BinaryOp", op.texto_original, {}, [node, right])
-        return node
-
-    def parse_mul(self) -> asaNode:
-        node = self.parse_unary()
-        while (p := self.peek()) and p.tipo_token == TipoToken.OPERADOR_ARITMETICO and p.texto_original in ("*", "/", "%"):
-            op = self.advance()
-            right = self.parse_unary()
-            node = asaNode("BinaryOp", op.texto_original, {}, [node, right])
-        return node
-
-    def parse_unary(self) -> asaNode:
-        if (p := self.peek()) and p.tipo_token == TipoToken.OPERADOR_ARITMETICO and p.texto_original in ("+", "-"):
-            op = self.advance()
-            node = self.parse_unary()
-            return asaNode("UnaryOp", op.texto_original, {}, [node])
-        return self.parse_primary()
+        """Expresión con precedencia (comparación < suma < producto) sin recursión.
+
+        Shunting-yard con pilas explícitas: los operadores de precedencia mayor o igual
+        se reducen antes de apilar el nuevo (asociatividad izquierda) y cada '(' guarda
+        el estado del nivel exterior, así los paréntesis y los unarios anidados no
+        consumen la pila de Python.
+        """
+        tipos = self._tipos
+        textos = self._textos
+        n = self._ntok
+        binop = asaNode.binop
+        operandos = []
+        operadores = []  # (operador, precedencia)
+        unarios = []
+        niveles = []  # estado del nivel exterior por cada '(' abierto
+        while True:
+            # Operando: prefijos unarios y luego '(' o un primario
+            i = self.pos
+            while i < n and tipos[i] is _TT_ARIT and (op := textos[i]) in ("+", "-"):
+                unarios.append(op)
+                i += 1
+            if i < n and tipos[i] is _TT_SYM and textos[i] == "(":
+                self.pos = i + 1
+                niveles.append((operandos, operadores, unarios))
+                operandos, operadores, unarios = [], [], []
+                continue
+            self.pos = i
+            node = self.parse_primary()
+            while True:
+                while unarios:
+                    node = asaNode("UnaryOp", unarios.pop(), None, [node])
+                i = self.pos
+                prec = _PRECEDENCIA.get((tipos[i], textos[i]), 0) if i < n else 0
+                while operadores and operadores[-1][1] >= prec:
+                    node = binop(operadores.pop()[0], operandos.pop(), node)
+                if prec:
+                    operandos.append(node)
+                    operadores.append((textos[i], prec))
+                    self.pos = i + 1
+                    break
+                if not niveles:
+                    return node
+                # Fin de la expresión entre paréntesis; el ')' es opcional
+                self._skip_if(")")
+                operandos, operadores, unarios = niveles.pop()
 
     def parse_primary(self) -> asaNode:
-        p = self.peek()
-        if not p:
+        i = self.pos
+        if i >= self._ntok:
             # No hay token: reportar error y devolver nodo de error en lugar de lanzar
             self._report_error("Expresión incompleta: EOF", None)
             return asaNode("PrimaryUnknown", "", {"linea": None})
-        if p.tipo_token == TipoToken.NUMERO_ENTERO:
-            n = self.advance()
-            return asaNode("Numero", n.texto_original, {"linea": n.numero_linea})
-        if p.tipo_token == TipoToken.NOMBRE_IDENTIFICADOR:
-            v = self.advance()
-            return asaNode("Nombre", v.texto_original, {"linea": v.numero_linea})
-        if p.tipo_token == TipoToken.INVOCACION_FUNCION:
-            inv = self.parse_invocacion_generica()
-            return inv
-        if p.tipo_token == TipoToken.SIMBOLO_PUNTUACION and p.texto_original == "(":
-            self.advance()
+        tipo = self._tipos[i]
+        tipo_nodo = _NODOS_PRIMARIOS.get(tipo)
+        if tipo_nodo:
+            self.pos = i + 1
+            return asaNode(tipo_nodo, self._originales[i], {"linea": self._lineas[i]})
+        if tipo is _TT_INVOC:
+            return self.parse_invocacion_generica()
+        if tipo is _TT_SYM and self._textos[i] == "(":
+            self.pos = i + 1
             node = self.parse_expression()
-            if self.peek() and self.peek().texto_original == ")":
-                self.advance()
+            self._skip_if(")")
             return node
         # fallback
-        tok = self.advance()
-        if not tok:
-            self._report_error("Token inesperado en expresión primaria", None)
-            return asaNode("PrimaryUnknown", "", {"linea": None})
-        return asaNode("PrimaryUnknown", tok.texto_original, {"linea": tok.numero_linea})
+        self.pos = i + 1
+        return asaNode("PrimaryUnknown", self._originales[i], {"linea": self._lineas[i]})
 
 # Integración con explorador
 def parse_from_tokens(tokens: List[TokenLexico]) -> asaNode:
+    """Parsea una lista de tokens y devuelve la raíz del asa.
+
+    Mientras dura el parseo se pausa el recolector cíclico (gc) de todo el proceso y
+    al final se deja como estaba. No es seguro para hilos: si otro hilo cambia el
+    estado del gc al mismo tiempo, el estado que queda al final puede no ser el suyo.
+    """
     parser = Parser(tokens)
-    raiz = parser.parse_program()
+    # El parseo solo crea nodos nuevos que quedan vivos en el asa; el recolector
+    # cíclico no tiene nada que liberar mientras tanto, así que se pausa.
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        raiz = parser.parse_program()
+    finally:
+        # Se restaura el estado previo: si quien llama ya lo tenía apagado, sigue apagado
+        if gc_activo:
+            gc.enable()
+        else:
+            gc.disable()
     # adjuntar errores sintácticos en atributos del root
     if isinstance(raiz.atributos, dict):
         raiz.atributos['parser_errors'] = parser.errors
@@ -741,13 +900,79 @@ def parse_from_tokens(tokens: List[TokenLexico]) -> asaNode:
     return raiz
 
 
-def parse_from_file(path: str) -> asaNode:
-    with open(path, encoding="utf-8") as f:
-        lineas = [l.rstrip("\n\r") for l in f.readlines()]
-    lex = AnalizadorLexico(lineas)
-    lex.analizar_codigo_completo()
-    tokens = lex.obtener_tokens()
-    return parse_from_tokens(tokens)
+def _lineas_de_bytes(contenido: bytes) -> List[str]:
+    # Mismas líneas que al leer en modo texto: UTF-8 y saltos de línea universales
+    texto = contenido.decode("utf-8")
+    if "\r" in texto:
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    lineas = texto.split("\n")
+    if lineas[-1] == "":
+        lineas.pop()
+    return lineas
+
+
+def _parse_contenido(contenido: bytes) -> asaNode:
+    # Los tokens van directo del explorador al parser, sin la lista interna del
+    # explorador ni la copia filtrada de obtener_tokens
+    return parse_from_tokens(list(AnalizadorLexico(_lineas_de_bytes(contenido)).iter_tokens()))
+
+
+@lru_cache(maxsize=None)
+def _huella_codigo() -> bytes:
+    # Hash de los módulos que deciden la forma del asa; se calcula una vez por proceso
+    h = hashlib.sha256(_VERSION_CACHE.encode())
+    for nombre in (AnalizadorLexico.__module__, asaNode.__module__, __name__):
+        with open(sys.modules[nombre].__file__, "rb") as f:
+            h.update(f.read())
+    return h.digest()
+
+
+def _parse_con_cache_en_disco(ruta: str, cache_dir: str) -> asaNode:
+    # La llave es el contenido del archivo y el código que lo parsea, no su ruta ni su fecha
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    clave = hashlib.sha256(_huella_codigo() + contenido).hexdigest()
+    destino = os.path.join(cache_dir, clave + ".pkl")
+    # Una entrada ilegible o de otra versión del código (clases o slots cambiados
+    # dan AttributeError, ImportError o TypeError) se ignora y se vuelve a parsear
+    try:
+        with open(destino, "rb") as f:
+            guardado = pickle.load(f)
+        if isinstance(guardado, asaNode):
+            return guardado
+    except Exception:
+        pass
+    raiz = _parse_contenido(contenido)
+    # La caché es opcional: si no se puede escribir (disco, permisos, o un asa tan
+    # profundo que pickle llega al límite de recursión) se borra el archivo a medias
+    # y se sigue sin ella
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(temporal, "wb") as f:
+            pickle.dump(raiz, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, destino)
+    except Exception:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+    return raiz
+
+
+def parse_from_file(path: str, cache_dir: Optional[str] = None) -> asaNode:
+    """Parsea un archivo .oly.
+
+    Sin cache_dir el archivo se parsea en cada llamada y cada una devuelve un asa nuevo.
+    Con cache_dir (por ejemplo ".oly-ast-cache") el asa se guarda en disco con pickle,
+    indexado por el SHA-256 del contenido y del código del explorador y el parser, y se
+    reutiliza entre ejecuciones mientras ninguno de los dos cambie.
+    """
+    ruta = os.path.abspath(path)
+    if cache_dir:
+        return _parse_con_cache_en_disco(ruta, cache_dir)
+    with open(ruta, "rb") as f:
+        return _parse_contenido(f.read())
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ Dependencias:
 
 from enum import Enum, auto
 import re
+import sys
 
 
 class TipoToken(Enum):
@@ -67,6 +68,12 @@ class TipoToken(Enum):
     TOKEN_NO_RECONOCIDO = auto()
 
 
+# Tipos de texto libre a nivel de módulo: comparar por identidad con una global es
+# más barato que buscar el miembro en el Enum por cada token
+_TT_COMENTARIO = TipoToken.COMENTARIO
+_TT_CADENA = TipoToken.LITERAL_CADENA
+
+
 class TokenLexico:
     """
     Representa un token léxico individual encontrado durante el análisis.
@@ -74,28 +81,53 @@ class TokenLexico:
     Atributos:
         tipo_token (TipoToken): El tipo de token identificado
         texto_original (str): El texto exacto del token en el código fuente
-        informacion_adicional (str): Información semántica adicional sobre el token
+        texto_lower (str): El texto del token en minúsculas, calculado una sola vez e internado
+        informacion_adicional (str): Información semántica adicional sobre el token; si no se
+            indica se calcula la primera vez que se lee
         numero_linea (int): Línea donde se encontró el token (opcional)
         posicion_columna (int): Columna donde inicia el token (opcional)
     """
+    # Sin __dict__ por token: un programa genera miles de tokens
+    __slots__ = ("tipo_token", "texto_original", "texto_lower", "_info", "numero_linea", "posicion_columna")
     
-    def __init__(self, tipo_token, texto_original, informacion_adicional="", numero_linea=0, posicion_columna=0):
+    def __init__(self, tipo_token, texto_original, informacion_adicional=None, numero_linea=0, posicion_columna=0):
         """
         Inicializa un nuevo token léxico.
         
         Argumentos:
             tipo_token (TipoToken): El tipo de token identificado
             texto_original (str): El texto exacto del token
-            informacion_adicional (str, optional): Información semántica adicional. Por defecto "".
+            informacion_adicional (str, optional): Información semántica adicional. Por defecto se
+                calcula a partir del tipo y el texto cuando se necesita.
             numero_linea (int, optional): Número de línea. Por defecto 0.
             posicion_columna (int, optional): Posición de columna. Por defecto 0.
         """
         self.tipo_token = tipo_token
         self.texto_original = texto_original
-        self.informacion_adicional = informacion_adicional
+        # Internado: el vocabulario es pequeño y las comparaciones del parser pasan por identidad.
+        # Comentarios y cadenas casi nunca se repiten, así que no se internan (igual que texto_original)
+        texto_lower = texto_original.lower()
+        if tipo_token is not _TT_COMENTARIO and tipo_token is not _TT_CADENA:
+            texto_lower = sys.intern(texto_lower)
+        self.texto_lower = texto_lower
+        self._info = informacion_adicional
         self.numero_linea = numero_linea
         self.posicion_columna = posicion_columna
 
+    @property
+    def informacion_adicional(self):
+        """
+        Información semántica del token. El parser no la usa, así que solo se arma
+        (y se guarda) cuando algún diagnóstico la pide.
+        """
+        if self._info is None:
+            self._info = AnalizadorLexico._extraer_informacion_semantica(self.tipo_token, self.texto_original)
+        return self._info
+
+    @informacion_adicional.setter
+    def informacion_adicional(self, valor):
+        self._info = valor
+
     def __str__(self):
         """
         Representación en cadena del token para depuración y visualización.
@@ -156,27 +188,73 @@ class AnalizadorLexico:
     """
     
     patrones_reconocimiento = [
-        (TipoToken.COMENTARIO, r'^;.*', "Comentario de línea completa"),
-        (TipoToken.DECLARACION_ENTIDAD, r'^(Deportista|Lista)', "Declaración de entidad del dominio"),
-        (TipoToken.TIPO_DATO_DOMINIO, r'^(Pais|Deporte|Resultado)', "Tipo de dato específico del dominio"),
-        (TipoToken.ESTRUCTURA_CONTROL_FLUJO, r'^(si|entonces|sino|endif|RepetirHasta|Repetir|FinRepHast|FinRep)', "Estructura de control de flujo"),
-        (TipoToken.INVOCACION_FUNCION, r'^(narrar\(|Comparar\(|input\()', "Invocación de función del sistema"),
-        (TipoToken.LITERAL_CADENA, r'^("[^"]*"|\'[^\']*\')', "Cadenas literales entre comillas"),
+        (TipoToken.COMENTARIO, r'^;.*'),
+        (TipoToken.DECLARACION_ENTIDAD, r'^(Deportista|Lista)'),
+        (TipoToken.TIPO_DATO_DOMINIO, r'^(Pais|Deporte|Resultado)'),
+        (TipoToken.ESTRUCTURA_CONTROL_FLUJO, r'^(si|entonces|sino|endif|RepetirHasta|Repetir|FinRepHast|FinRep)'),
+        (TipoToken.INVOCACION_FUNCION, r'^(narrar\(|Comparar\(|input\()'),
+        (TipoToken.LITERAL_CADENA, r'^("[^"]*"|\'[^\']*\')'),
         # Palabras clave del dominio extendidas (competencias, fases, etc.)
-        (TipoToken.PALABRA_CLAVE, r'^(preparacion|finprep|InicioCarrera|correr|finCarr|InicioRutina|ejecutar|finRuti|InicioCombate|finComb|finact|ceremonia_medallas|competencia_oficial|partido_clasificatorio|Medallas|Ganador)', "Palabras clave del dominio"),
+        (TipoToken.PALABRA_CLAVE, r'^(preparacion|finprep|InicioCarrera|correr|finCarr|InicioRutina|ejecutar|finRuti|InicioCombate|finComb|finact|ceremonia_medallas|competencia_oficial|partido_clasificatorio|Medallas|Ganador)'),
         # ResultadoExtra y Empate según gramática avanzada
-        (TipoToken.RESULTADO_ADICIONAL, r'^(listaRes)', "Token específico para listas de resultados"),
-        (TipoToken.CONDICION_EMPATE, r'^(empate)', "Token específico para condiciones de empate"),
-        (TipoToken.OPERADOR_COMPARACION, r'^(==|!=|>=|<=|>|<)', "Operador de comparación lógica"),
-        (TipoToken.OPERADOR_ESPECIAL, r'^(vs)', "Operador especial vs"),
-        (TipoToken.OPERADOR_ARITMETICO, r'^(\+|-|\*|/|%)', "Operador aritmético básico"),
-        (TipoToken.NUMERO_ENTERO, r'^([0-9]+)', "Número entero positivo"),
-        (TipoToken.VALOR_BOOLEANO, r'^(True|False)', "Valor lógico booleano"),
-    (TipoToken.NOMBRE_IDENTIFICADOR, r'^([A-Za-zñáéíóúüÑÁÉÍÓÚÜ_][A-Za-z0-9ñáéíóúüÑÁÉÍÓÚÜ_]*)', "Identificador válido"),
-        (TipoToken.SIMBOLO_PUNTUACION, r'^([(),;:{}\[\]\.-])', "Símbolo de puntuación o delimitador"),
-        (TipoToken.ESPACIOS_BLANCOS, r'^(\s)+', "Espacios en blanco y caracteres de formato")
+        (TipoToken.RESULTADO_ADICIONAL, r'^(listaRes)'),
+        (TipoToken.CONDICION_EMPATE, r'^(empate)'),
+        (TipoToken.OPERADOR_COMPARACION, r'^(==|!=|>=|<=|>|<)'),
+        (TipoToken.OPERADOR_ESPECIAL, r'^(vs)'),
+        (TipoToken.OPERADOR_ARITMETICO, r'^(\+|-|\*|/|%)'),
+        (TipoToken.NUMERO_ENTERO, r'^([0-9]+)'),
+        (TipoToken.VALOR_BOOLEANO, r'^(True|False)'),
+        (TipoToken.NOMBRE_IDENTIFICADOR, r'^([A-Za-zñáéíóúüÑÁÉÍÓÚÜ_][A-Za-z0-9ñáéíóúüÑÁÉÍÓÚÜ_]*)'),
+        (TipoToken.SIMBOLO_PUNTUACION, r'^([(),;:{}\[\]\.-])'),
+        (TipoToken.ESPACIOS_BLANCOS, r'^(\s)+')
     ]
 
+    # Descripción de cada patrón, solo para documentación y diagnóstico
+    descripciones_patrones = {
+        TipoToken.COMENTARIO: "Comentario de línea completa",
+        TipoToken.DECLARACION_ENTIDAD: "Declaración de entidad del dominio",
+        TipoToken.TIPO_DATO_DOMINIO: "Tipo de dato específico del dominio",
+        TipoToken.ESTRUCTURA_CONTROL_FLUJO: "Estructura de control de flujo",
+        TipoToken.INVOCACION_FUNCION: "Invocación de función del sistema",
+        TipoToken.LITERAL_CADENA: "Cadenas literales entre comillas",
+        TipoToken.PALABRA_CLAVE: "Palabras clave del dominio",
+        TipoToken.RESULTADO_ADICIONAL: "Token específico para listas de resultados",
+        TipoToken.CONDICION_EMPATE: "Token específico para condiciones de empate",
+        TipoToken.OPERADOR_COMPARACION: "Operador de comparación lógica",
+        TipoToken.OPERADOR_ESPECIAL: "Operador especial vs",
+        TipoToken.OPERADOR_ARITMETICO: "Operador aritmético básico",
+        TipoToken.NUMERO_ENTERO: "Número entero positivo",
+        TipoToken.VALOR_BOOLEANO: "Valor lógico booleano",
+        TipoToken.NOMBRE_IDENTIFICADOR: "Identificador válido",
+        TipoToken.SIMBOLO_PUNTUACION: "Símbolo de puntuación o delimitador",
+        TipoToken.ESPACIOS_BLANCOS: "Espacios en blanco y caracteres de formato",
+    }
+
+    # Todos los patrones en una sola alternativa con un grupo por tipo. La alternancia
+    # se prueba en el mismo orden que la lista, así que gana el mismo patrón que antes
+    patron_maestro = re.compile("|".join(
+        f"(?P<{tipo.name}>{patron[1:] if patron.startswith('^') else patron})"
+        for tipo, patron in patrones_reconocimiento
+    ))
+    tipo_por_grupo = {tipo.name: tipo for tipo, _ in patrones_reconocimiento}
+
+    # Caracteres que siempre forman solos un token: ningún patrón anterior de la lista
+    # empieza con ellos ('-' es aritmético porque ese patrón va antes que la puntuación)
+    grupo_un_caracter = dict.fromkeys("(),:{}[].", TipoToken.SIMBOLO_PUNTUACION.name)
+    grupo_un_caracter.update(dict.fromkeys("+-*/%", TipoToken.OPERADOR_ARITMETICO.name))
+
+    # Información semántica ya armada: texto -> (tipo, información). Los nombres, números,
+    # operadores y palabras reservadas se repiten mucho; comentarios y cadenas no se guardan
+    informacion_cacheada = {}
+    limite_informacion_cacheada = 4096
+
+    # Caracteres ASCII que se reportan como símbolo fuera de la gramática
+    simbolos_no_definidos = frozenset('@#$%&^*=~')
+
+    # Tipos cuyo texto casi nunca se repite (no se internan ni se cachean)
+    tipos_texto_libre = frozenset((TipoToken.COMENTARIO, TipoToken.LITERAL_CADENA))
+    grupos_texto_libre = frozenset(tipo.name for tipo in tipos_texto_libre)
+
     def __init__(self, codigo_fuente_lineas):
         """
         Inicializa el analizador léxico con el código fuente a procesar.
@@ -188,6 +266,8 @@ class AnalizadorLexico:
         self.tokens_encontrados = []
         self.contador_errores_lexicos = 0
         self.errores_detallados = []
+        # Tokens por tipo (nombre del TipoToken), contados mientras se analiza
+        self._conteo_por_tipo = {}
 
     def analizar_codigo_completo(self):
         """
@@ -200,15 +280,25 @@ class AnalizadorLexico:
             int: Número total de tokens válidos encontrados (excluyendo espacios en blanco)
         """
         self.tokens_encontrados.clear()
+        self.tokens_encontrados.extend(self.iter_tokens())
+        
+        tokens_validos = [t for t in self.tokens_encontrados if t.tipo_token != TipoToken.ESPACIOS_BLANCOS]
+        return len(tokens_validos)
+
+    def iter_tokens(self):
+        """
+        Genera los tokens del código fuente línea por línea, sin guardarlos en
+        tokens_encontrados. Reinicia el conteo de errores igual que analizar_codigo_completo.
+        
+        Salida:
+            generator: Objetos TokenLexico en orden (sin espacios en blanco)
+        """
         self.contador_errores_lexicos = 0
         self.errores_detallados.clear()
+        self._conteo_por_tipo.clear()
         
         for numero_linea, linea_codigo in enumerate(self.codigo_fuente_lineas, 1):
-            tokens_linea = self._procesar_linea_individual(linea_codigo, numero_linea)
-            self.tokens_encontrados.extend(tokens_linea)
-        
-        tokens_validos = [t for t in self.tokens_encontrados if t.tipo_token != TipoToken.ESPACIOS_BLANCOS]
-        return len(tokens_validos)
+            yield from self._procesar_linea_individual(linea_codigo, numero_linea)
 
     def obtener_tokens(self, incluir_espacios=False):
         """
@@ -258,7 +348,16 @@ class AnalizadorLexico:
         Salida:
             list: Lista de diccionarios con información de cada error
         """
-        return self.errores_detalladas.copy()
+        return self.errores_detallados.copy()
+
+    def obtener_conteo_por_tipo(self):
+        """
+        Retorna cuántos tokens de cada tipo se encontraron en el último análisis.
+        
+        Salida:
+            dict: Nombre del tipo de token -> cantidad, en orden de primera aparición
+        """
+        return dict(self._conteo_por_tipo)
 
     def obtener_resumen(self):
         """
@@ -267,20 +366,17 @@ class AnalizadorLexico:
         Salida:
             dict: Diccionario con estadísticas del análisis
         """
-        tokens_validos = self.obtener_tokens()
+        # El conteo por tipo se lleva durante el análisis; no hace falta recorrer los tokens
+        tokens_por_tipo = self.obtener_conteo_por_tipo()
         
         resumen = {
             'total_lineas': len(self.codigo_fuente_lineas),
-            'total_tokens': len(tokens_validos),
+            'total_tokens': sum(tokens_por_tipo.values()),
             'total_errores': self.contador_errores_lexicos,
-            'tokens_por_tipo': {},
+            'tokens_por_tipo': tokens_por_tipo,
             'tiene_errores': self.contador_errores_lexicos > 0
         }
         
-        for token in tokens_validos:
-            tipo_nombre = token.tipo_token.name
-            resumen['tokens_por_tipo'][tipo_nombre] = resumen['tokens_por_tipo'].get(tipo_nombre, 0) + 1
-        
         return resumen
 
     def _procesar_linea_individual(self, linea_codigo, numero_linea):
@@ -293,81 +389,117 @@ class AnalizadorLexico:
             numero_linea (int): Número de línea para referencia de errores
             
         Salida:
-            list: Lista de tokens encontrados en la línea
+            generator: Tokens encontrados en la línea, en orden
         """
-        tokens_linea = []
-        posicion_actual = 0
         linea_limpia = linea_codigo.rstrip()
+        # La sangría se salta de una vez con lstrip en lugar de caracter por caracter
+        posicion_actual = len(linea_limpia) - len(linea_limpia.lstrip(' \t'))
 
-        while posicion_actual < len(linea_limpia):
-            segmento_restante = linea_limpia[posicion_actual:]
-            token_encontrado = False
+        patron_maestro = self.patron_maestro
+        tipo_por_grupo = self.tipo_por_grupo
+        grupo_un_caracter = self.grupo_un_caracter
+        simbolos_no_definidos = self.simbolos_no_definidos
+        grupos_texto_libre = self.grupos_texto_libre
+        conteo_por_tipo = self._conteo_por_tipo
 
-            for tipo_token, patron_regex, descripcion in self.patrones_reconocimiento:
-                coincidencia = re.match(patron_regex, segmento_restante)
-                
+        largo_linea = len(linea_limpia)
+
+        while posicion_actual < largo_linea:
+            # Espacios y tabs se saltan sin pasar por el motor de expresiones; el patrón
+            # ESPACIOS_BLANCOS queda para el resto de caracteres de espacio
+            caracter = linea_limpia[posicion_actual]
+            if caracter in ' \t':
+                posicion_actual += 1
+                continue
+
+            # Símbolos y operadores de un caracter: mismo resultado que el patrón maestro,
+            # sin pasar por el motor de expresiones
+            grupo = grupo_un_caracter.get(caracter)
+            if grupo:
+                texto_token = caracter
+                fin_token = posicion_actual + 1
+            else:
+                coincidencia = patron_maestro.match(linea_limpia, posicion_actual)
                 if coincidencia:
+                    grupo = coincidencia.lastgroup
                     texto_token = coincidencia.group()
-                    
-                    if tipo_token != TipoToken.ESPACIOS_BLANCOS:
-                        informacion_semantica = self._extraer_informacion_semantica(tipo_token, texto_token)
-                        nuevo_token = TokenLexico(
-                            tipo_token, 
-                            texto_token, 
-                            informacion_semantica,
-                            numero_linea,
-                            posicion_actual + 1
-                        )
-                        tokens_linea.append(nuevo_token)
-                    
-                    posicion_actual += coincidencia.end()
-                    token_encontrado = True
-                    break
-
-            if not token_encontrado:
-                caracter_problematico = segmento_restante[0]
+                    fin_token = coincidencia.end()
+
+            if grupo:
+                tipo_token = tipo_por_grupo[grupo]
+
+                if tipo_token != TipoToken.ESPACIOS_BLANCOS:
+                    # Nombres, palabras reservadas, números y operadores se repiten mucho en
+                    # un programa: se internan para compartir un solo objeto por texto
+                    if grupo not in grupos_texto_libre:
+                        texto_token = sys.intern(texto_token)
+                    # La información semántica se calcula al leerla (ver TokenLexico)
+                    nuevo_token = TokenLexico(
+                        tipo_token,
+                        texto_token,
+                        None,
+                        numero_linea,
+                        posicion_actual + 1
+                    )
+                    # El grupo de la expresión se llama igual que el TipoToken
+                    conteo_por_tipo[grupo] = conteo_por_tipo.get(grupo, 0) + 1
+                    yield nuevo_token
+
+                posicion_actual = fin_token
+            else:
+                caracter_problematico = caracter
+                codigo = ord(caracter_problematico)
                 
-                try:
-                    if ord(caracter_problematico) < 128:
-                        caracter_mostrable = f"'{caracter_problematico}'"
-                    else:
-                        caracter_mostrable = f"Unicode U+{ord(caracter_problematico):04X}"
-                    
-                    if ord(caracter_problematico) > 127:
-                        tipo_error = "caracter Unicode no soportado"
-                    elif caracter_problematico in '@#$%&^*=~':
+                if codigo < 128:
+                    caracter_mostrable = f"'{caracter_problematico}'"
+                    if caracter_problematico in simbolos_no_definidos:
                         tipo_error = "simbolo no definido en la gramatica"
                     else:
                         tipo_error = "caracter no reconocido"
-                    
-                    # Guardar error en lista
-                    error_info = {
-                        'tipo': tipo_error,
-                        'caracter': caracter_mostrable,
-                        'linea': numero_linea,
-                        'columna': posicion_actual + 1,
-                        'mensaje': f"ERROR LEXICO: {tipo_error} {caracter_mostrable} en linea {numero_linea}, columna {posicion_actual + 1}"
-                    }
-                    self.errores_detalladas.append(error_info)
-                    
-                except Exception as e:
-                    error_info = {
-                        'tipo': 'error desconocido',
-                        'caracter': f"ord({ord(caracter_problematico)})",
-                        'linea': numero_linea,
-                        'columna': posicion_actual + 1,
-                        'mensaje': f"ERROR LEXICO: caracter problematico (ord={ord(caracter_problematico)}) en linea {numero_linea}, columna {posicion_actual + 1}"
-                    }
-                    self.errores_detalladas.append(error_info)
+                else:
+                    caracter_mostrable = f"Unicode U+{codigo:04X}"
+                    tipo_error = "caracter Unicode no soportado"
+                
+                # Guardar error en lista
+                error_info = {
+                    'tipo': tipo_error,
+                    'caracter': caracter_mostrable,
+                    'linea': numero_linea,
+                    'columna': posicion_actual + 1,
+                    'mensaje': f"ERROR LEXICO: {tipo_error} {caracter_mostrable} en linea {numero_linea}, columna {posicion_actual + 1}"
+                }
+                self.errores_detallados.append(error_info)
                 
                 self.contador_errores_lexicos += 1
                 posicion_actual += 1
 
-        return tokens_linea
-
-    def _extraer_informacion_semantica(self, tipo_token, texto_token):
+    @staticmethod
+    def _extraer_informacion_semantica(tipo_token, texto_token):
         """
         Extrae información semántica adicional basada en el tipo y contenido del token.
+        Para los tipos de vocabulario fijo el texto se arma una sola vez y se reutiliza.
+        
+        Entradas:
+            tipo_token (TipoToken): El tipo de token identificado
+            texto_token (str): El texto original del token
+            
+        Salida:
+            str: Información semántica adicional sobre el token
+        """
+        # La llave es solo el texto (hashear el TipoToken es lento); se confirma el tipo
+        guardada = AnalizadorLexico.informacion_cacheada.get(texto_token)
+        if guardada is not None and guardada[0] is tipo_token:
+            return guardada[1]
+        informacion = AnalizadorLexico._formatear_informacion_semantica(tipo_token, texto_token)
+        if (tipo_token not in AnalizadorLexico.tipos_texto_libre
+                and len(AnalizadorLexico.informacion_cacheada) < AnalizadorLexico.limite_informacion_cacheada):
+            AnalizadorLexico.informacion_cacheada[texto_token] = (tipo_token, informacion)
+        return informacion
+
+    @staticmethod
+    def _formatear_informacion_semantica(tipo_token, texto_token):
+        """
+        Arma el texto de información semántica según el tipo y contenido del token.
         
         Entradas:
             tipo_token (TipoToken): El tipo de token identificado
@@ -377,11 +509,8 @@ class AnalizadorLexico:
             str: Información semántica adicional sobre el token
         """
         if tipo_token == TipoToken.NUMERO_ENTERO:
-            try:
-                valor_numerico = int(texto_token)
-                return f"Valor numérico: {valor_numerico}"
-            except ValueError:
-                return "Error al convertir número entero"
+            # El patrón ya garantiza solo dígitos: basta quitar los ceros a la izquierda
+            return f"Valor numérico: {texto_token.lstrip('0') or '0'}"
                 
         elif tipo_token == TipoToken.NUMERO_DECIMAL:
             try:
@@ -51,11 +51,9 @@ def leer_archivo_olympiac(ruta_archivo):
         raise FileNotFoundError(f"El archivo no existe: {ruta_archivo}")
     
     try:
+        # Se recorre el archivo línea a línea, removiendo el salto de línea de cada una
         with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-            lineas = archivo.readlines()
-        
-        # Remover el salto de línea de cada línea
-        lineas_limpias = [linea.rstrip('\n\r') for linea in lineas]
+            lineas_limpias = [linea.rstrip('\n\r') for linea in archivo]
         
         return lineas_limpias
     
@@ -7,21 +7,38 @@ from typing import List, Dict, Any, Iterator
 
 
 class asaNode:
+    __slots__ = ("tipo", "contenido", "atributos", "hijos")
+
     def __init__(self, tipo: str, contenido: str = "", atributos: Dict[str, Any] = None, hijos: List['asaNode'] = None):
         self.tipo = tipo
         self.contenido = contenido or ""
-        self.atributos = atributos or {}
-        self.hijos = hijos or []
+        # Se reutilizan el diccionario y la lista recibidos; solo se crean si faltan
+        self.atributos = atributos if atributos is not None else {}
+        self.hijos = hijos if hijos is not None else []
+
+    @classmethod
+    def binop(cls, op: str, izq: 'asaNode', der: 'asaNode') -> 'asaNode':
+        """Crea un nodo BinaryOp asignando los campos directamente, sin pasar por __init__."""
+        nodo = object.__new__(cls)
+        nodo.tipo = "BinaryOp"
+        nodo.contenido = op
+        nodo.atributos = {}
+        nodo.hijos = [izq, der]
+        return nodo
 
     def agregar_hijo(self, nodo: 'asaNode'):
         self.hijos.append(nodo)
 
     def preorder_lines(self, nivel: int = 0) -> Iterator[str]:
-        indent = "  " * nivel
-        # Atributos se presentan como diccionario legible
-        yield f'{indent}<"{self.tipo}", "{self.contenido}", {self.atributos}>'
-        for h in self.hijos:
-            yield from h.preorder_lines(nivel + 1)
+        # Recorrido con pila explícita: los hijos se apilan al revés para salir en orden
+        pila = [(self, nivel)]
+        while pila:
+            nodo, nivel = pila.pop()
+            # Atributos se presentan como diccionario legible
+            yield f'{"  " * nivel}<"{nodo.tipo}", "{nodo.contenido}", {nodo.atributos}>'
+            hijos = nodo.hijos
+            if hijos:
+                pila.extend([(h, nivel + 1) for h in reversed(hijos)])
 
     def __str__(self) -> str:
         return "\n".join(self.preorder_lines())
@@ -0,0 +1,272 @@
+import pickle
+
+import pytest
+
+from analizador_sintactico import Parser, parse_from_file, parse_from_tokens
+from explorador import AnalizadorLexico
+
+
+def parse_src(src):
+    lex = AnalizadorLexico(src)
+    lex.analizar_codigo_completo()
+    return parse_from_tokens(lex.obtener_tokens())
+
+
+def test_despacho_comandos_simples():
+    src = [
+        "; comentario",
+        "finact finCarr correr",
+        "A . agregar",
+    ]
+    asa = parse_src(src)
+    tipos = [h.tipo for h in asa.hijos]
+    assert tipos == ["Comentario", "FinAct", "FinCarr", "Clave", "Identificador", "Simbolo", "Identificador"]
+    assert asa.hijos[1].atributos == {"linea": 2}
+
+
+def test_despacho_partido_por_lookahead():
+    asa = parse_src(["Brasil vs Chile finact"])
+    partido = asa.hijos[0]
+    assert partido.tipo == "Partido"
+    assert partido.atributos["paisA"] == "Brasil"
+    assert partido.atributos["paisB"] == "Chile"
+
+
+def test_token_fuera_de_produccion():
+    asa = parse_src(["entonces"])
+    assert asa.hijos[0].tipo == "Unknown"
+    assert asa.atributos["parser_errors"][0]["mensaje"] == "Token fuera de producción Comando"
+
+
+def test_precedencia_expresiones():
+    lex = AnalizadorLexico(["a + b * c == d - e"])
+    lex.analizar_codigo_completo()
+    expr = Parser(lex.obtener_tokens()).parse_expression()
+    assert expr.contenido == "=="
+    suma, resta = expr.hijos
+    assert suma.contenido == "+"
+    assert [h.contenido for h in suma.hijos] == ["a", "*"]
+    assert [h.contenido for h in suma.hijos[1].hijos] == ["b", "c"]
+    assert resta.contenido == "-"
+
+
+def test_parse_from_file_devuelve_asa_nuevo(tmp_path):
+    archivo = tmp_path / "prueba.oly"
+    archivo.write_text("finact\n", encoding="utf-8")
+    a = parse_from_file(str(archivo))
+    b = parse_from_file(str(archivo))
+    assert a is not b
+    assert a.to_dict() == b.to_dict()
+    a.hijos.clear()
+    assert [h.tipo for h in parse_from_file(str(archivo)).hijos] == ["FinAct"]
+
+
+def test_parse_from_file_cache_detecta_cambios(tmp_path):
+    archivo = tmp_path / "prueba.oly"
+    archivo.write_text("finact\n", encoding="utf-8")
+    assert [h.tipo for h in parse_from_file(str(archivo)).hijos] == ["FinAct"]
+    archivo.write_text("finact finCarr\n", encoding="utf-8")
+    assert [h.tipo for h in parse_from_file(str(archivo)).hijos] == ["FinAct", "FinCarr"]
+
+
+def test_bloques_anidados_sin_recursion():
+    profundidad = 3000
+    src = ["Repetir ( 2 ) ["] * profundidad + ["finact"] + ["] FinRep"] * profundidad
+    asa = parse_src(src)
+    assert asa.atributos["parser_errors"] == []
+    nodo = asa.hijos[0]
+    for _ in range(profundidad - 1):
+        assert nodo.tipo == "Repetir"
+        nodo = nodo.hijos[0]
+    assert [h.tipo for h in nodo.hijos] == ["FinAct"]
+    lineas = list(asa.preorder_lines())
+    assert len(lineas) == profundidad + 2
+    assert lineas[-1] == "  " * (profundidad + 1) + "<\"FinAct\", \"finact\", {'linea': %d}>" % (profundidad + 1)
+
+
+def test_deportista_estadisticas():
+    asa = parse_src(["Deportista Ana 1 2 3 Futbol Chile", "Deportista Luis 4 5 Futbol Peru"])
+    completo, incompleto = asa.hijos
+    assert completo.tipo == "Deportista"
+    assert completo.atributos["estadisticas"] == ["1", "2", "3"]
+    assert incompleto.tipo == "ErrorSintactico"
+    assert incompleto.atributos["estadisticas"] == ["4", "5", None]
+
+
+def test_lista_deportista_carga_masiva():
+    asa = parse_src(["Lista Deportista Ana 1 2 3 Futbol Chile", "Luis 4 5 6 Tenis Peru", "finact"])
+    carga, fin = asa.hijos
+    assert carga.tipo == "CargaDeportistas"
+    assert carga.atributos["deportistas"] == [
+        {"nombre": "Ana", "estadisticas": ["1", "2", "3"], "deporte": "Futbol", "pais": "Chile"},
+        {"nombre": "Luis", "estadisticas": ["4", "5", "6"], "deporte": "Tenis", "pais": "Peru"},
+    ]
+    assert fin.tipo == "FinAct"
+    assert asa.atributos["parser_errors"] == []
+
+
+def test_lista_deportista_declaracion_simple():
+    asa = parse_src(["Lista Deportista Equipo"])
+    lista = asa.hijos[0]
+    assert lista.tipo == "Lista"
+    assert lista.atributos == {"tipo": "Deportista", "nombre": "Equipo", "linea": 1}
+    assert asa.atributos["parser_errors"] == []
+
+
+def test_acciones_y_competencias_anidadas_sin_recursion():
+    profundidad = 3000
+    asa = parse_src(["Medallas"] * profundidad + ["InicioCarrera correr Resultado 1 - 2 finCarr"])
+    nodo = asa.hijos[0]
+    for _ in range(profundidad - 1):
+        assert nodo.tipo == "AccionStub"
+        nodo = nodo.hijos[0]
+    carrera = nodo.hijos[0]
+    assert carrera.tipo == "Carrera"
+    assert [h.tipo for h in carrera.hijos] == ["Clave", "Resultado"]
+
+
+def test_competencias_comparten_cuerpo():
+    asa = parse_src(["InicioRutina ejecutar Resultado", "InicioCombate finComb"])
+    rutina, combate = asa.hijos
+    assert (rutina.tipo, rutina.contenido) == ("Rutina", "InicioRutina")
+    assert [h.tipo for h in rutina.hijos] == ["Clave", "Resultado"]
+    assert (combate.tipo, combate.contenido) == ("Combate", "InicioCombate")
+    mensajes = [e["mensaje"] for e in asa.atributos["parser_errors"]]
+    assert "Combate requiere 'Resultado' antes de 'finComb'" in mensajes
+
+
+def test_empate_duplicado_no_se_queda_en_el_token():
+    asa = parse_src(["Brasil vs Chile empate empate finact"])
+    partido = asa.hijos[0]
+    assert [h.tipo for h in partido.hijos] == ["Empate"]
+    mensajes = [e["mensaje"] for e in asa.atributos["parser_errors"]]
+    assert "Empate duplicado en Partido" in mensajes
+
+
+def test_synchronize_limite_de_pasos():
+    # Sin anclas en 500 tokens se descarta el resto del archivo
+    asa = parse_src(["Deportista 1 " + "x " * 600, "si"])
+    assert [h.tipo for h in asa.hijos] == ["ErrorSintactico"]
+    # Con un ancla cerca, la recuperación se detiene en ella
+    asa = parse_src(["Deportista 1 " + "x " * 10, "si"])
+    assert [h.tipo for h in asa.hijos] == ["ErrorSintactico", "Condicional"]
+
+
+def test_errores_acotados():
+    asa = parse_src(["entonces"] * 300)
+    assert len(asa.hijos) == 300
+    errores = asa.atributos["parser_errors"]
+    assert len(errores) == 201
+    assert errores[-1] == {"mensaje": "Demasiados errores (200); se omitieron los restantes", "linea": 201, "columna": 1}
+    assert all(e["mensaje"] == "Token fuera de producción Comando" for e in errores[:200])
+
+
+def test_expresion_anidada_sin_recursion():
+    profundidad = 3000
+    lex = AnalizadorLexico(["- ( " * profundidad + "a" + " ) * 2" * profundidad])
+    lex.analizar_codigo_completo()
+    parser = Parser(lex.obtener_tokens())
+    nodo = parser.parse_expression()
+    assert parser.pos == parser._ntok
+    # Cada nivel es (-(...)) * 2: el unario liga más fuerte que el producto
+    for _ in range(profundidad):
+        assert (nodo.tipo, nodo.contenido) == ("BinaryOp", "*")
+        assert nodo.hijos[1].contenido == "2"
+        nodo = nodo.hijos[0]
+        assert (nodo.tipo, nodo.contenido) == ("UnaryOp", "-")
+        nodo = nodo.hijos[0]
+    assert nodo.contenido == "a"
+
+
+def test_parse_from_file_cache_en_disco(tmp_path):
+    archivo = tmp_path / "prueba.oly"
+    archivo.write_text("finact\r\nfinCarr\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    a = parse_from_file(str(archivo), cache_dir=str(cache))
+    assert a.to_dict() == parse_from_file(str(archivo)).to_dict()
+    assert len(list(cache.iterdir())) == 1
+    b = parse_from_file(str(archivo), cache_dir=str(cache))
+    assert b is not a
+    assert b.to_dict() == a.to_dict()
+
+
+def test_parse_from_file_cache_en_disco_ignora_entradas_invalidas(tmp_path):
+    archivo = tmp_path / "prueba.oly"
+    archivo.write_text("finact\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    parse_from_file(str(archivo), cache_dir=str(cache))
+    entrada, = cache.iterdir()
+    # Pickle que no es un asa y pickle de una clase que ya no existe
+    for contenido in (pickle.dumps([1, 2]), b"\x80\x04cnodo\nClaseQueNoExiste\n)\x81."):
+        entrada.write_bytes(contenido)
+        asa = parse_from_file(str(archivo), cache_dir=str(cache))
+        assert [h.tipo for h in asa.hijos] == ["FinAct"]
+
+
+def test_parse_from_tokens_respeta_estado_del_gc():
+    import gc
+    activo = gc.isenabled()
+    try:
+        gc.disable()
+        parse_src(["finact"])
+        assert not gc.isenabled()
+        gc.enable()
+        parse_src(["finact"])
+        assert gc.isenabled()
+    finally:
+        if activo:
+            gc.enable()
+        else:
+            gc.disable()
+
+
+def test_sync_tokens_asignados_despues_del_primer_error():
+    lex = AnalizadorLexico(["x y", "a b", "alto z"])
+    lex.analizar_codigo_completo()
+    parser = Parser(lex.obtener_tokens())
+    parser.synchronize()
+    assert parser.pos == 6  # sin anclas: se consume todo
+    parser.sync_tokens = {"alto"}
+    parser.pos = 0
+    parser.synchronize()
+    assert parser.pos == 4
+    assert parser.sync_tokens == frozenset({"alto"})
+
+
+@pytest.mark.parametrize("con_cache", [False, True])
+def test_parse_from_file_bloques_anidados(tmp_path, con_cache):
+    # La misma profundidad que test_bloques_anidados_sin_recursion, por la entrada pública
+    profundidad = 3000
+    archivo = tmp_path / "profundo.oly"
+    archivo.write_text("\n".join(["Repetir ( 2 ) ["] * profundidad + ["finact"] + ["] FinRep"] * profundidad), encoding="utf-8")
+    cache_dir = str(tmp_path / "cache") if con_cache else None
+    # Dos llamadas: con caché la segunda pasa por la lectura de la caché
+    for _ in range(2):
+        asa = parse_from_file(str(archivo), cache_dir=cache_dir)
+        assert asa.atributos["parser_errors"] == []
+        lineas = list(asa.preorder_lines())
+        assert len(lineas) == profundidad + 2
+        assert lineas[-1] == "  " * (profundidad + 1) + "<\"FinAct\", \"finact\", {'linea': %d}>" % (profundidad + 1)
+
+
+def test_parse_from_file_cache_en_disco_asa_profundo(tmp_path):
+    # pickle no puede guardar un asa tan profundo: se devuelve el asa sin dejar restos
+    profundidad = 300
+    archivo = tmp_path / "profundo.oly"
+    archivo.write_text("\n".join(["Repetir ( 2 ) ["] * profundidad + ["finact"] + ["] FinRep"] * profundidad), encoding="utf-8")
+    cache = tmp_path / "cache"
+    asa = parse_from_file(str(archivo), cache_dir=str(cache))
+    assert asa.to_dict() == parse_from_file(str(archivo)).to_dict()
+    assert list(cache.iterdir()) == []
+
+
+def test_parse_from_file_cache_en_disco_depende_del_codigo(tmp_path, monkeypatch):
+    import analizador_sintactico
+    archivo = tmp_path / "prueba.oly"
+    archivo.write_text("finact\n", encoding="utf-8")
+    cache = tmp_path / "cache"
+    parse_from_file(str(archivo), cache_dir=str(cache))
+    # Otro código (otra huella) no reutiliza la entrada guardada
+    monkeypatch.setattr(analizador_sintactico, "_huella_codigo", lambda: b"otra version")
+    parse_from_file(str(archivo), cache_dir=str(cache))
+    assert len(list(cache.iterdir())) == 2
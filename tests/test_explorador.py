@@ -0,0 +1,92 @@
+from explorador import AnalizadorLexico, TipoToken
+
+
+def lex_src(src):
+    lex = AnalizadorLexico(src)
+    lex.analizar_codigo_completo()
+    return lex.obtener_tokens()
+
+
+def test_orden_de_patrones():
+    tokens = lex_src(["RepetirHasta Repetir sino Deportistas 007 a>=b ; resto"])
+    assert [(t.tipo_token, t.texto_original) for t in tokens] == [
+        (TipoToken.ESTRUCTURA_CONTROL_FLUJO, "RepetirHasta"),
+        (TipoToken.ESTRUCTURA_CONTROL_FLUJO, "Repetir"),
+        (TipoToken.ESTRUCTURA_CONTROL_FLUJO, "si"),
+        (TipoToken.NOMBRE_IDENTIFICADOR, "no"),
+        (TipoToken.DECLARACION_ENTIDAD, "Deportista"),
+        (TipoToken.NOMBRE_IDENTIFICADOR, "s"),
+        (TipoToken.NUMERO_ENTERO, "007"),
+        (TipoToken.NOMBRE_IDENTIFICADOR, "a"),
+        (TipoToken.OPERADOR_COMPARACION, ">="),
+        (TipoToken.NOMBRE_IDENTIFICADOR, "b"),
+        (TipoToken.COMENTARIO, "; resto"),
+    ]
+
+
+def test_columnas_y_lineas():
+    tokens = lex_src(["narrar( x )", "\tvs"])
+    assert [(t.texto_original, t.numero_linea, t.posicion_columna) for t in tokens] == [
+        ("narrar(", 1, 1), ("x", 1, 9), (")", 1, 11), ("vs", 2, 2),
+    ]
+    assert tokens[0].informacion_adicional == "Función del sistema invocada"
+
+
+def test_iter_tokens_no_guarda_tokens():
+    lex = AnalizadorLexico(["Deportista Ana", "finact"])
+    generados = [t.texto_original for t in lex.iter_tokens()]
+    assert generados == ["Deportista", "Ana", "finact"]
+    assert lex.tokens_encontrados == []
+    assert lex.analizar_codigo_completo() == 3
+    assert [t.texto_original for t in lex.obtener_tokens()] == generados
+
+
+def test_informacion_adicional_perezosa():
+    token = lex_src(["42"])[0]
+    assert token._info is None
+    assert token.informacion_adicional == "Valor numérico: 42"
+    assert token._info == "Valor numérico: 42"
+    assert token.to_tuple() == ("NUMERO_ENTERO", "42", "Valor numérico: 42", 1, 1)
+
+
+def test_conteo_por_tipo_durante_el_analisis():
+    lex = AnalizadorLexico(["Deportista Ana 1 2", "Ana"])
+    lex.analizar_codigo_completo()
+    conteo = {"DECLARACION_ENTIDAD": 1, "NOMBRE_IDENTIFICADOR": 2, "NUMERO_ENTERO": 2}
+    assert lex.obtener_conteo_por_tipo() == conteo
+    resumen = lex.obtener_resumen()
+    assert resumen["tokens_por_tipo"] == conteo
+    assert resumen["total_tokens"] == 5
+    lex.analizar_codigo_completo()
+    assert lex.obtener_conteo_por_tipo() == conteo
+
+
+def test_informacion_compartida_por_texto():
+    a, b, c = lex_src(["Deportista + Deportista"])
+    assert a.informacion_adicional == "Declaración de entidad del tipo: Deportista"
+    assert a.informacion_adicional is c.informacion_adicional
+    assert b.informacion_adicional == "Operador de suma"
+    literal = lex_src(['"hola"'])[0]
+    assert literal.texto_original not in AnalizadorLexico.informacion_cacheada
+
+
+def test_errores_lexicos_se_reportan():
+    lex = AnalizadorLexico(["a @ b", "→"])
+    lex.analizar_codigo_completo()
+    assert [t.texto_original for t in lex.obtener_tokens()] == ["a", "b"]
+    errores = lex.obtener_errores()
+    assert [(e["tipo"], e["caracter"], e["linea"], e["columna"]) for e in errores] == [
+        ("simbolo no definido en la gramatica", "'@'", 1, 3),
+        ("caracter Unicode no soportado", "Unicode U+2192", 2, 1),
+    ]
+    assert lex.contador_errores_lexicos == 2
+
+
+def test_texto_libre_no_se_interna():
+    import sys
+    internado = sys.intern("".join(["; un comentario ", "unico 8271"]))
+    comentario, = lex_src(["; Un Comentario Unico 8271"])
+    assert comentario.texto_lower == internado
+    assert comentario.texto_lower is not internado
+    nombre, = lex_src(["Ana"])
+    assert sys.intern("ana") is nombre.texto_lower